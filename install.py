@@ -2,23 +2,223 @@
 """
 Komodo Periphery Home Assistant Add-on Installation Script
 Cross-platform Python version supporting Linux, macOS, and Windows
-Usage: python install.py [--dev|--production] [--help]
+Usage: python install.py [--dev|--production] [-y] [--ha-config PATH] [--help]
 """
 
-import argparse
+import errno
+import functools
 import json
 import os
 import platform
-import shutil
+import shlex
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import List, Optional, Set
 
 # Configuration
 ADDON_NAME = "komodo-periphery"
 ADDON_SLUG = "komodo_periphery"
 REPO_NAME = "komodo-periphery-addon"
+APT_LISTS_DIR = "/var/lib/apt/lists"
+APT_LISTS_MAX_AGE = 3600  # seconds
+BASE_IMAGE = "alpine:3.21"  # Dockerfile default BUILD_FROM for local builds
+BASE_IMAGE_PULL_TIMEOUT = 600  # seconds
+BUILD_CACHE_DIR = ".buildcache"
+
+# Values of KOMODO_INSTALL_YES that enable --assume-yes
+TRUTHY_VALUES = frozenset({"1", "true", "yes", "y"})
+
+# Files and directories left out when copying the addon for local development
+LOCAL_DEV_SKIP_NAMES = frozenset(
+    (".git", ".devcontainer", BUILD_CACHE_DIR, "DEVELOPMENT.md")
+)
+LOCAL_DEV_SKIP_SUFFIXES = (".py", ".sh", ".ps1")
+
+# Package manager per /etc/os-release ID or ID_LIKE entry
+OS_RELEASE_PATH = "/etc/os-release"
+OS_RELEASE_MANAGERS = {
+    "debian": "apt-get",
+    "ubuntu": "apt-get",
+    "fedora": "dnf",
+    "rhel": "dnf",
+    "centos": "dnf",
+    "arch": "pacman",
+    "suse": "zypper",
+    "opensuse": "zypper",
+}
+
+# Common Home Assistant config locations, relative to the home directory
+HA_PATHS_WINDOWS = (
+    ".homeassistant",
+    "homeassistant",
+    "Documents/HomeAssistant",
+    "Development/homeassistant",
+    "C:/homeassistant",
+    "C:/config",
+)
+HA_PATHS_POSIX = (
+    ".homeassistant",
+    "homeassistant",
+    "/usr/share/hassio/homeassistant",
+    "/config",
+    "Documents/HomeAssistant",
+    "Development/homeassistant",
+)
+
+
+# Static files generated by the installer, serialized once at import
+_DEVCONTAINER_JSON = json.dumps(
+    {
+        "name": "Home Assistant Add-on Development",
+        "image": "ghcr.io/home-assistant/devcontainer:addons",
+        "workspaceFolder": "/workspaces/${localWorkspaceFolderBasename}",
+        "mounts": ["source=/var/run/docker.sock,target=/var/run/docker.sock,type=bind"],
+        "features": {
+            "ghcr.io/devcontainers/features/docker-in-docker:2": {},
+            "ghcr.io/devcontainers/features/git:1": {},
+        },
+        "customizations": {
+            "vscode": {
+                "extensions": [
+                    "ms-vscode.vscode-json",
+                    "redhat.vscode-yaml",
+                    "ms-vscode.vscode-docker",
+                    "esbenp.prettier-vscode",
+                    "bradlc.vscode-tailwindcss",
+                ],
+                "settings": {
+                    "terminal.integrated.defaultProfile.linux": "bash",
+                    "editor.formatOnSave": True,
+                    "editor.codeActionsOnSave": {"source.organizeImports": True},
+                },
+            }
+        },
+        "postCreateCommand": "chmod +x install.sh && ./install.sh --dev",
+        "remoteUser": "vscode",
+    },
+    indent=2,
+).encode()
+
+_BUILD_CONFIG = f"""build_from:
+  aarch64: ghcr.io/home-assistant/alpine-base:3.21
+  amd64: ghcr.io/home-assistant/alpine-base:3.21
+  armhf: ghcr.io/home-assistant/alpine-base:3.21
+  armv7: ghcr.io/home-assistant/alpine-base:3.21
+  i386: ghcr.io/home-assistant/alpine-base:3.21
+labels:
+  org.opencontainers.image.title: "Komodo Periphery"
+  org.opencontainers.image.description: "Komodo Periphery agent for Home Assistant OS monitoring"
+  org.opencontainers.image.source: "https://github.com/your-username/{REPO_NAME}"
+  org.opencontainers.image.licenses: "MIT"
+args:
+  KOMODO_VERSION: "latest"
+codenotary: "your-email@example.com"
+""".encode()
+
+_DEV_DOC = """# Komodo Periphery Add-on Development
+
+## Development Setup
+
+### Prerequisites
+- Python 3.7+
+- Docker and Docker Compose
+- Git
+- Visual Studio Code (recommended)
+
+### Cross-Platform Installation
+```bash
+# Using Python (cross-platform)
+python install.py --dev
+
+# Using Bash (Linux/macOS)
+./install.sh --dev
+
+# Using PowerShell (Windows)
+.\\install.ps1 -Dev
+```
+
+### Platform-Specific Notes
+
+#### Linux
+- Package manager detection (apt, yum, pacman)
+- Automatic Docker service configuration
+- User added to docker group
+
+#### macOS
+- Requires Homebrew
+- Docker Desktop installation check
+- Xcode Command Line Tools may be needed
+
+#### Windows
+- PowerShell 5.1+ required
+- Docker Desktop for Windows
+- WSL2 recommended for performance
+- Git Bash alternative for shell scripts
+
+### Development Workflow
+1. Make changes to configuration or scripts
+2. Test locally: `python install.py --dev`
+3. Build and test: `docker build -t komodo-periphery .`
+4. Submit pull request
+
+### Architecture Support
+- amd64 (x86_64)
+- aarch64 (ARM64)
+- armv7 (ARM 32-bit)
+- armhf (ARM hard-float)
+- i386 (x86 32-bit)
+
+### Directory Structure
+```
+komodo_periphery/
+├── config.yaml              # Add-on configuration
+├── Dockerfile               # Container definition
+├── README.md                # User documentation
+├── icon.svg                 # Add-on icon (128x128)
+├── rootfs/                  # Container filesystem
+│   └── etc/services.d/
+│       └── komodo-periphery/
+│           ├── run          # S6 service script
+│           └── finish       # S6 cleanup script
+├── translations/            # UI translations
+│   └── en.yaml
+├── .devcontainer/           # VS Code devcontainer
+├── install.py               # Python installer
+├── install.sh               # Bash installer
+└── install.ps1              # PowerShell installer
+```
+""".encode()
+
+_GITIGNORE = """# Build artifacts
+build/
+dist/
+.buildcache/
+*.log
+
+# Development files
+.DS_Store
+Thumbs.db
+*.tmp
+*.temp
+__pycache__/
+*.pyc
+
+# VS Code
+.vscode/settings.json
+.vscode/launch.json
+
+# Local configuration
+local_config.yaml
+secrets.yaml
+
+# Backup files
+*.backup.*
+""".encode()
 
 
 class Colors:
@@ -34,11 +234,24 @@ class Colors:
     ENDC = "\033[0m"
     BOLD = "\033[1m"
 
+    # Log line prefixes, rebuilt whenever colors are toggled
+    INFO = f"{GREEN}[INFO]{ENDC} "
+    WARN = f"{YELLOW}[WARN]{ENDC} "
+    ERROR = f"{RED}[ERROR]{ENDC} "
+
+    @classmethod
+    def _update_prefixes(cls):
+        """Rebuild the log prefixes from the current colors"""
+        cls.INFO = f"{cls.GREEN}[INFO]{cls.ENDC} "
+        cls.WARN = f"{cls.YELLOW}[WARN]{cls.ENDC} "
+        cls.ERROR = f"{cls.RED}[ERROR]{cls.ENDC} "
+
     @classmethod
     def disable(cls):
         """Disable colors for Windows without ANSI support"""
         cls.RED = cls.GREEN = cls.YELLOW = cls.BLUE = ""
         cls.MAGENTA = cls.CYAN = cls.WHITE = cls.ENDC = cls.BOLD = ""
+        cls._update_prefixes()
 
     @classmethod
     def enable(cls):
@@ -52,6 +265,7 @@ class Colors:
         cls.WHITE = "\033[97m"
         cls.ENDC = "\033[0m"
         cls.BOLD = "\033[1m"
+        cls._update_prefixes()
 
 
 class Installer:
@@ -62,10 +276,19 @@ class Installer:
     environment setup across Linux, macOS, and Windows platforms.
     """
 
-    def __init__(self):
+    def __init__(self, assume_yes: bool = False, ha_config: Optional[str] = None):
         self.os_type = platform.system().lower()
+        self.assume_yes = (
+            assume_yes
+            or os.getenv("KOMODO_INSTALL_YES", "").strip().lower() in TRUTHY_VALUES
+        )
+        self.ha_config = ha_config
         self.ha_config_dir: Optional[Path] = None
         self.ha_addons_dir: Optional[Path] = None
+        self._print_lock = threading.Lock()
+        self._path_names: Optional[Set[str]] = None
+        self._pull_thread: Optional[threading.Thread] = None
+        self._buildx: Optional[bool] = None
 
         # Disable colors on Windows unless in modern terminal
         if self.os_type == "windows" and not self._supports_ansi():
@@ -77,15 +300,18 @@ class Installer:
 
     def print_status(self, message: str):
         """Print status message in green"""
-        print(f"{Colors.GREEN}[INFO]{Colors.ENDC} {message}")
+        with self._print_lock:
+            sys.stdout.write(f"{Colors.INFO}{message}\n")
 
     def print_warning(self, message: str):
         """Print warning message in yellow"""
-        print(f"{Colors.YELLOW}[WARN]{Colors.ENDC} {message}")
+        with self._print_lock:
+            sys.stdout.write(f"{Colors.WARN}{message}\n")
 
     def print_error(self, message: str):
         """Print error message in red"""
-        print(f"{Colors.RED}[ERROR]{Colors.ENDC} {message}")
+        with self._print_lock:
+            sys.stdout.write(f"{Colors.ERROR}{message}\n")
 
     def print_header(self):
         """Print installation header"""
@@ -94,29 +320,106 @@ class Installer:
         print(f"{'=' * 46}{Colors.ENDC}\n")
 
     def command_exists(self, command: str) -> bool:
-        """Check if a command exists in PATH"""
-        return shutil.which(command) is not None
+        """Check if a command exists in PATH (PATH is scanned once)"""
+        if self._path_names is None:
+            self._path_names = self._scan_path()
+
+        if self.os_type == "windows":
+            command = command.lower()
+            extensions = os.getenv("PATHEXT", ".COM;.EXE;.BAT;.CMD").lower()
+            return command in self._path_names or any(
+                command + ext in self._path_names for ext in extensions.split(";")
+            )
+        return command in self._path_names
+
+    def _scan_path(self) -> Set[str]:
+        """Collect the names of the executable files in the PATH directories"""
+        names: Set[str] = set()
+        for directory in os.getenv("PATH", "").split(os.pathsep):
+            try:
+                with os.scandir(directory or ".") as entries:
+                    # Same checks as shutil.which: a file the user can execute
+                    names.update(
+                        entry.name
+                        for entry in entries
+                        if entry.is_file() and os.access(entry.path, os.X_OK)
+                    )
+            except OSError:
+                continue
+        if self.os_type == "windows":
+            # Windows file names are case-insensitive
+            names = {name.lower() for name in names}
+        return names
+
+    def invalidate_which(self, command: str):
+        """Rescan PATH on the next lookup if command was not found before"""
+        if self._path_names is not None and command not in self._path_names:
+            self._path_names = None
 
     def run_command(
-        self, command: List[str], check: bool = True
+        self, command: List[str], check: bool = True, capture: bool = False
     ) -> subprocess.CompletedProcess:
-        """Run a shell command"""
+        """Run a shell command, capturing stdout only when requested"""
+        # stderr is always piped so failures can still be reported
+        stdout = subprocess.PIPE if capture else subprocess.DEVNULL
         try:
-            return subprocess.run(command, check=check, capture_output=True, text=True)
+            return subprocess.run(
+                command, check=check, stdout=stdout, stderr=subprocess.PIPE, text=True
+            )
         except subprocess.CalledProcessError as e:
             self.print_error(f"Command failed: {' '.join(command)}")
             self.print_error(f"Error: {e.stderr}")
             raise
 
+    def stream_command(self, command: List[str]):
+        """Run a long command, echoing its output line by line as it arrives"""
+        with subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        ) as proc:
+            for line in proc.stdout:
+                with self._print_lock:
+                    sys.stdout.write(line)
+            returncode = proc.wait()
+        if returncode:
+            self.print_error(f"Command failed: {' '.join(command)}")
+            raise subprocess.CalledProcessError(returncode, command)
+
+    @functools.lru_cache(maxsize=1)
     def detect_package_manager(self) -> Optional[str]:
         """Detect available package manager on Linux"""
+        # /etc/os-release identifies the distro family without probing PATH
+        manager = self._package_manager_from_os_release()
+        if manager and self.command_exists(manager):
+            return manager
+
         managers = ["apt-get", "yum", "dnf", "pacman", "zypper"]
         for manager in managers:
             if self.command_exists(manager):
                 return manager
         return None
 
-    def install_dependencies(self):
+    def _package_manager_from_os_release(self) -> Optional[str]:
+        """Map the ID/ID_LIKE fields of /etc/os-release to a package manager"""
+        distro_ids: List[str] = []
+        try:
+            with open(OS_RELEASE_PATH, encoding="utf-8") as f:
+                for line in f:
+                    key, _, value = line.strip().partition("=")
+                    if key in ("ID", "ID_LIKE"):
+                        distro_ids.extend(value.strip("\"'").split())
+        except OSError:
+            return None
+
+        for distro_id in distro_ids:
+            if distro_id in OS_RELEASE_MANAGERS:
+                return OS_RELEASE_MANAGERS[distro_id]
+        return None
+
+    def install_dependencies(self, prefetch_base_image: bool = False):
         """Install required dependencies based on OS"""
         self.print_status("Installing dependencies...")
 
@@ -125,6 +428,11 @@ class Installer:
             tool for tool in required_tools if not self.command_exists(tool)
         ]
 
+        # Overlap the base image pull with the package installation; only
+        # the development setup builds an image
+        if prefetch_base_image and "docker" not in missing_tools:
+            self._start_base_image_pull()
+
         if self.os_type == "linux":
             self._install_linux_dependencies(missing_tools)
         elif self.os_type == "darwin":
@@ -135,6 +443,35 @@ class Installer:
             self.print_error(f"Unsupported operating system: {self.os_type}")
             sys.exit(1)
 
+        # Re-detect tools that may have just been installed
+        for tool in missing_tools:
+            self.invalidate_which(tool)
+
+        if (
+            prefetch_base_image
+            and "docker" in missing_tools
+            and self.command_exists("docker")
+        ):
+            self._start_base_image_pull()
+
+    def _start_base_image_pull(self):
+        """Pull the Docker base image in the background ahead of the build"""
+        self._pull_thread = threading.Thread(
+            target=subprocess.run,
+            args=(["docker", "pull", BASE_IMAGE],),
+            kwargs={
+                "stdout": subprocess.DEVNULL,
+                "stderr": subprocess.DEVNULL,
+                "check": False,
+            },
+        )
+        self._pull_thread.start()
+
+    def finish_base_image_pull(self):
+        """Wait for the background base image pull, if one was started"""
+        if self._pull_thread is not None:
+            self._pull_thread.join(timeout=BASE_IMAGE_PULL_TIMEOUT)
+
     def _install_linux_dependencies(self, missing_tools: List[str]):
         """Install dependencies on Linux"""
         if not missing_tools:
@@ -149,34 +486,37 @@ class Installer:
 
         self.print_status(f"Installing dependencies via {pkg_manager}...")
 
+        # Refresh metadata and install in a single package manager transaction
+        packages = " ".join(missing_tools + ["docker-compose", "jq"])
         if pkg_manager == "apt-get":
-            self.run_command(["sudo", "apt-get", "update"])
-            self.run_command(
-                ["sudo", "apt-get", "install", "-y"]
-                + missing_tools
-                + ["docker-compose", "jq"]
+            install_script = (
+                "DEBIAN_FRONTEND=noninteractive apt-get install -y "
+                f"--no-install-recommends {packages}"
             )
+            if not self._apt_lists_fresh():
+                install_script = f"apt-get update -qq && {install_script}"
         elif pkg_manager in ["yum", "dnf"]:
-            self.run_command(["sudo", pkg_manager, "update", "-y"])
-            self.run_command(
-                ["sudo", pkg_manager, "install", "-y"]
-                + missing_tools
-                + ["docker-compose", "jq"]
-            )
+            # Metadata refresh is implicit in install for yum/dnf
+            install_script = f"{pkg_manager} -y install {packages}"
         elif pkg_manager == "pacman":
-            self.run_command(
-                ["sudo", "pacman", "-Syu", "--noconfirm"]
-                + missing_tools
-                + ["docker-compose", "jq"]
-            )
+            install_script = f"pacman -Syu --noconfirm {packages}"
+        else:
+            install_script = f"{pkg_manager} install -y {packages}"
+
+        self.run_command(["sudo", "sh", "-c", install_script])
 
         # Start Docker service and add user to docker group
         if "docker" in missing_tools:
+            # $USER is reset by sudo, so resolve the invoking user here
+            user = shlex.quote(os.getenv("USER", "user"))
             try:
-                self.run_command(["sudo", "systemctl", "enable", "docker"])
-                self.run_command(["sudo", "systemctl", "start", "docker"])
                 self.run_command(
-                    ["sudo", "usermod", "-aG", "docker", os.getenv("USER", "user")]
+                    [
+                        "sudo",
+                        "sh",
+                        "-c",
+                        f"systemctl enable --now docker && usermod -aG docker {user}",
+                    ]
                 )
                 self.print_warning(
                     "You may need to log out and back in for Docker group changes to take effect."
@@ -186,6 +526,14 @@ class Installer:
                     "Could not configure Docker service. Please configure manually."
                 )
 
+    def _apt_lists_fresh(self) -> bool:
+        """Check if apt package lists were refreshed recently"""
+        try:
+            age = time.time() - os.stat(APT_LISTS_DIR).st_mtime
+        except OSError:
+            return False
+        return age < APT_LISTS_MAX_AGE
+
     def _install_macos_dependencies(self, missing_tools: List[str]):
         """Install dependencies on macOS"""
         if not self.command_exists("brew"):
@@ -196,6 +544,7 @@ class Installer:
         if missing_tools:
             self.print_status("Installing dependencies via Homebrew...")
             self.run_command(["brew", "install"] + missing_tools + ["jq"])
+            self.invalidate_which("docker")
 
         if not self.command_exists("docker"):
             self.print_warning(
@@ -216,6 +565,10 @@ class Installer:
                 "- Docker Desktop: https://docs.docker.com/desktop/install/windows-install/"
             )
 
+            if self.assume_yes:
+                self.print_warning("Continuing without the missing tools.")
+                return
+
             choice = input("Continue anyway? (y/N): ")
             if choice.lower() != "y":
                 sys.exit(1)
@@ -224,60 +577,65 @@ class Installer:
         """Find Home Assistant configuration directory"""
         self.print_status("Looking for Home Assistant configuration directory...")
 
-        # Common paths for different OS
-        home = Path.home()
-
-        if self.os_type == "windows":
-            ha_paths = [
-                home / ".homeassistant",
-                home / "homeassistant",
-                home / "Documents" / "HomeAssistant",
-                home / "Development" / "homeassistant",
-                Path("C:/homeassistant"),
-                Path("C:/config"),
-            ]
-        else:
-            ha_paths = [
-                home / ".homeassistant",
-                home / "homeassistant",
-                Path("/usr/share/hassio/homeassistant"),
-                Path("/config"),
-                home / "Documents" / "HomeAssistant",
-                home / "Development" / "homeassistant",
-            ]
+        # An explicitly requested directory must be valid, never fall back
+        if self.ha_config:
+            if not self._has_ha_config(self.ha_config):
+                self.print_error(
+                    f"No configuration.yaml found in --ha-config: {self.ha_config}"
+                )
+                sys.exit(1)
+            self._use_ha_config(self.ha_config, "Using")
+            return
 
-        # Check environment variable
+        # Check environment variable before building the candidate list
         env_path = os.getenv("HA_CONFIG_PATH")
-        if env_path:
-            ha_paths.insert(0, Path(env_path))
+        if env_path and self._has_ha_config(env_path):
+            self._use_ha_config(env_path, "Found")
+            return
+
+        # Relative candidates resolve against home; absolute ones are kept as-is
+        home = os.path.expanduser("~")
+        candidates = HA_PATHS_WINDOWS if self.os_type == "windows" else HA_PATHS_POSIX
 
         # Find existing config
-        for path in ha_paths:
-            if (path / "configuration.yaml").exists():
-                self.ha_config_dir = path
-                self.ha_addons_dir = path / "addons"
-                self.print_status(
-                    f"Found Home Assistant config at: {self.ha_config_dir}"
-                )
+        for candidate in candidates:
+            path = os.path.join(home, candidate)
+            if self._has_ha_config(path):
+                self._use_ha_config(path, "Found")
                 return
 
         # Ask user for path
         self.print_warning(
             "Home Assistant configuration directory not found automatically."
         )
+        if self.assume_yes:
+            self.print_error("Pass --ha-config or set HA_CONFIG_PATH to continue.")
+            sys.exit(1)
+
         user_path = input(
             "Please enter the path to your Home Assistant config directory: "
         )
 
-        user_path = Path(user_path)
-        if (user_path / "configuration.yaml").exists():
-            self.ha_config_dir = user_path
-            self.ha_addons_dir = user_path / "addons"
-            self.print_status(f"Using Home Assistant config at: {self.ha_config_dir}")
+        if self._has_ha_config(user_path):
+            self._use_ha_config(user_path, "Using")
         else:
             self.print_error("Invalid Home Assistant configuration directory.")
             sys.exit(1)
 
+    def _has_ha_config(self, path: str) -> bool:
+        """Check for configuration.yaml with a single stat call"""
+        try:
+            os.stat(os.path.join(path, "configuration.yaml"))
+        except OSError:
+            return False
+        return True
+
+    def _use_ha_config(self, path: str, verb: str):
+        """Record the Home Assistant config and addons directories"""
+        self.ha_config_dir = Path(path)
+        self.ha_addons_dir = self.ha_config_dir / "addons"
+        self.print_status(f"{verb} Home Assistant config at: {self.ha_config_dir}")
+
     def setup_devcontainer(self):
         """Setup VS Code devcontainer"""
         self.print_status("Setting up VS Code devcontainer...")
@@ -285,44 +643,14 @@ class Installer:
         devcontainer_dir = Path(".devcontainer")
         devcontainer_dir.mkdir(exist_ok=True)
 
-        devcontainer_config = {
-            "name": "Home Assistant Add-on Development",
-            "image": "ghcr.io/home-assistant/devcontainer:addons",
-            "workspaceFolder": "/workspaces/${localWorkspaceFolderBasename}",
-            "mounts": [
-                "source=/var/run/docker.sock,target=/var/run/docker.sock,type=bind"
-            ],
-            "features": {
-                "ghcr.io/devcontainers/features/docker-in-docker:2": {},
-                "ghcr.io/devcontainers/features/git:1": {},
-            },
-            "customizations": {
-                "vscode": {
-                    "extensions": [
-                        "ms-vscode.vscode-json",
-                        "redhat.vscode-yaml",
-                        "ms-vscode.vscode-docker",
-                        "esbenp.prettier-vscode",
-                        "bradlc.vscode-tailwindcss",
-                    ],
-                    "settings": {
-                        "terminal.integrated.defaultProfile.linux": "bash",
-                        "editor.formatOnSave": True,
-                        "editor.codeActionsOnSave": {"source.organizeImports": True},
-                    },
-                }
-            },
-            "postCreateCommand": "chmod +x install.sh && ./install.sh --dev",
-            "remoteUser": "vscode",
-        }
-
-        with open(devcontainer_dir / "devcontainer.json", "w", encoding="utf-8") as f:
-            json.dump(devcontainer_config, f, indent=2)
+        (devcontainer_dir / "devcontainer.json").write_bytes(_DEVCONTAINER_JSON)
 
         self.print_status("Devcontainer configuration created.")
 
     def setup_local_dev(self):
         """Setup local development environment"""
+        import shutil  # pylint: disable=import-outside-toplevel
+
         self.print_status("Setting up local development environment...")
 
         # Create addons directory
@@ -334,7 +662,13 @@ class Installer:
         if addon_target.exists():
             backup_name = f"{addon_target}.backup.{self._get_timestamp()}"
             self.print_warning(f"Addon directory exists, backing up to: {backup_name}")
-            shutil.move(str(addon_target), backup_name)
+            try:
+                # Same parent directory, so this is normally an O(1) rename
+                os.rename(addon_target, backup_name)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(str(addon_target), backup_name)
 
         # Try to create symlink, fallback to copy
         try:
@@ -343,15 +677,39 @@ class Installer:
         except OSError:
             # Symlink failed (common on Windows), copy instead
             self.print_warning("Cannot create symlink, copying files instead...")
-            shutil.copytree(
-                ".",
-                str(addon_target),
-                ignore=shutil.ignore_patterns(
-                    ".git", ".devcontainer", "*.py", "*.sh", "*.ps1", "DEVELOPMENT.md"
-                ),
-            )
+            # Hardlink files where possible so no file contents are copied
+            self._copy_tree(".", str(addon_target))
             self.print_status(f"Copied addon files to: {addon_target}")
 
+    @classmethod
+    def _copy_tree(cls, src: str, dst: str):
+        """Recursively link or copy src into dst, skipping installer-only files"""
+        os.makedirs(dst, exist_ok=True)
+        with os.scandir(src) as entries:
+            for entry in entries:
+                name = entry.name
+                if name in LOCAL_DEV_SKIP_NAMES or name.endswith(
+                    LOCAL_DEV_SKIP_SUFFIXES
+                ):
+                    continue
+                target = os.path.join(dst, name)
+                # DirEntry caches the stat result from the directory scan
+                if entry.is_dir():
+                    cls._copy_tree(entry.path, target)
+                else:
+                    cls._link_or_copy(entry.path, target)
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: str):
+        """Hardlink a file, copying it when linking is not possible"""
+        import shutil  # pylint: disable=import-outside-toplevel
+
+        try:
+            os.link(src, dst)
+        except OSError:
+            # Cross-device, unsupported filesystem or insufficient permissions
+            shutil.copy2(src, dst)
+
     def build_addon(self):
         """Build addon Docker image"""
         self.print_status("Building addon Docker image...")
@@ -375,47 +733,55 @@ class Installer:
             )
             sys.exit(1)
 
+        # A failed pull is not fatal, docker build pulls the base image itself
+        self.finish_base_image_pull()
+
         try:
             self.print_status(f"Building Docker image: {image_name}")
-            self.run_command(
-                [
+            if self.buildx_cache_supported():
+                # Persist the layer cache between runs for incremental rebuilds
+                Path(BUILD_CACHE_DIR).mkdir(exist_ok=True)
+                build_command = [
                     "docker",
+                    "buildx",
                     "build",
-                    "--build-arg",
-                    f"BUILD_ARCH={arch}",
-                    "-t",
-                    image_name,
-                    ".",
+                    f"--cache-from=type=local,src={BUILD_CACHE_DIR}",
+                    f"--cache-to=type=local,dest={BUILD_CACHE_DIR},mode=max",
+                    "--load",
                 ]
+            else:
+                build_command = ["docker", "build"]
+            self.stream_command(
+                build_command
+                + ["--build-arg", f"BUILD_ARCH={arch}", "-t", image_name, "."]
             )
             self.print_status("Build completed successfully!")
         except subprocess.CalledProcessError:
             self.print_error("Docker build failed.")
             sys.exit(1)
 
+    def buildx_cache_supported(self) -> bool:
+        """Check once whether buildx can export a local layer cache"""
+        if self._buildx is None:
+            # The default "docker" driver rejects --cache-to=type=local
+            result = self.run_command(
+                ["docker", "buildx", "inspect"], check=False, capture=True
+            )
+            drivers = [
+                line.split(":", 1)[1].strip()
+                for line in result.stdout.splitlines()
+                if line.startswith("Driver:")
+            ]
+            self._buildx = (
+                result.returncode == 0 and bool(drivers) and drivers[0] != "docker"
+            )
+        return self._buildx
+
     def setup_production(self):
         """Setup production deployment files"""
         self.print_status("Setting up production deployment...")
 
-        # Create build.yaml
-        build_config = f"""build_from:
-  aarch64: ghcr.io/home-assistant/alpine-base:3.21
-  amd64: ghcr.io/home-assistant/alpine-base:3.21
-  armhf: ghcr.io/home-assistant/alpine-base:3.21
-  armv7: ghcr.io/home-assistant/alpine-base:3.21
-  i386: ghcr.io/home-assistant/alpine-base:3.21
-labels:
-  org.opencontainers.image.title: "Komodo Periphery"
-  org.opencontainers.image.description: "Komodo Periphery agent for Home Assistant OS monitoring"
-  org.opencontainers.image.source: "https://github.com/your-username/{REPO_NAME}"
-  org.opencontainers.image.licenses: "MIT"
-args:
-  KOMODO_VERSION: "latest"
-codenotary: "your-email@example.com"
-"""
-
-        with open("build.yaml", "w", encoding="utf-8") as f:
-            f.write(build_config)
+        Path("build.yaml").write_bytes(_BUILD_CONFIG)
 
         self.print_status("Production deployment files created.")
 
@@ -423,82 +789,7 @@ codenotary: "your-email@example.com"
         """Create development documentation"""
         self.print_status("Creating development documentation...")
 
-        dev_doc = """# Komodo Periphery Add-on Development
-
-## Development Setup
-
-### Prerequisites
-- Python 3.7+
-- Docker and Docker Compose
-- Git
-- Visual Studio Code (recommended)
-
-### Cross-Platform Installation
-```bash
-# Using Python (cross-platform)
-python install.py --dev
-
-# Using Bash (Linux/macOS)
-./install.sh --dev
-
-# Using PowerShell (Windows)
-.\\install.ps1 -Dev
-```
-
-### Platform-Specific Notes
-
-#### Linux
-- Package manager detection (apt, yum, pacman)
-- Automatic Docker service configuration
-- User added to docker group
-
-#### macOS
-- Requires Homebrew
-- Docker Desktop installation check
-- Xcode Command Line Tools may be needed
-
-#### Windows
-- PowerShell 5.1+ required
-- Docker Desktop for Windows
-- WSL2 recommended for performance
-- Git Bash alternative for shell scripts
-
-### Development Workflow
-1. Make changes to configuration or scripts
-2. Test locally: `python install.py --dev`
-3. Build and test: `docker build -t komodo-periphery .`
-4. Submit pull request
-
-### Architecture Support
-- amd64 (x86_64)
-- aarch64 (ARM64)
-- armv7 (ARM 32-bit)
-- armhf (ARM hard-float)
-- i386 (x86 32-bit)
-
-### Directory Structure
-```
-komodo_periphery/
-├── config.yaml              # Add-on configuration
-├── Dockerfile               # Container definition
-├── README.md                # User documentation
-├── icon.svg                 # Add-on icon (128x128)
-├── rootfs/                  # Container filesystem
-│   └── etc/services.d/
-│       └── komodo-periphery/
-│           ├── run          # S6 service script
-│           └── finish       # S6 cleanup script
-├── translations/            # UI translations
-│   └── en.yaml
-├── .devcontainer/           # VS Code devcontainer
-├── install.py               # Python installer
-├── install.sh               # Bash installer
-└── install.ps1              # PowerShell installer
-```
-"""
-
-        with open("DEVELOPMENT.md", "w", encoding="utf-8") as f:
-            f.write(dev_doc)
+        Path("DEVELOPMENT.md").write_bytes(_DEV_DOC)
 
         self.print_status("Development documentation created.")
 
@@ -512,45 +803,22 @@ komodo_periphery/
         """Initialize Git repository if not exists"""
         if not Path(".git").exists():
             self.print_status("Initializing Git repository...")
-            self.run_command(["git", "init"])
-
-            gitignore = """# Build artifacts
-build/
-dist/
-*.log
-
-# Development files
-.DS_Store
-Thumbs.db
-*.tmp
-*.temp
-__pycache__/
-*.pyc
 
-# VS Code
-.vscode/settings.json
-.vscode/launch.json
-
-# Local configuration
-local_config.yaml
-secrets.yaml
-
-# Backup files
-*.backup.*
-"""
-
-            with open(".gitignore", "w", encoding="utf-8") as f:
-                f.write(gitignore)
+            Path(".gitignore").write_bytes(_GITIGNORE)
 
-            self.run_command(["git", "add", "."])
-            self.run_command(
-                [
-                    "git",
-                    "commit",
-                    "-m",
-                    "Initial commit: Komodo Periphery Home Assistant Add-on",
-                ]
-            )
+            message = "Initial commit: Komodo Periphery Home Assistant Add-on"
+            try:
+                # Use dulwich when available to avoid spawning git processes
+                # pylint: disable-next=import-outside-toplevel
+                from dulwich import porcelain
+            except ImportError:
+                self.run_command(["git", "init"])
+                self.run_command(["git", "add", "."])
+                self.run_command(["git", "commit", "-m", message])
+            else:
+                porcelain.init(".")
+                porcelain.add(".")
+                porcelain.commit(".", message=message.encode("utf-8"))
             self.print_status("Git repository initialized.")
 
 
@@ -558,11 +826,21 @@ def setup_development_environment(installer: Installer):
     """Set up the development environment."""
     installer.print_status("Setting up development environment...")
     installer.find_ha_config()
-    installer.setup_devcontainer()
-    installer.setup_local_dev()
-    installer.build_addon()
-    installer.create_documentation()
+
+    # The generated files are independent, so write them concurrently. The
+    # build context is ".", so the build only starts once every file (and
+    # the initial commit) is in place; the base image pull overlaps instead.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        file_steps = [
+            executor.submit(installer.setup_devcontainer),
+            executor.submit(installer.setup_local_dev),
+            executor.submit(installer.create_documentation),
+        ]
+        wait(file_steps, return_when=ALL_COMPLETED)
+        for step in file_steps:
+            step.result()
     installer.initialize_git()
+    installer.build_addon()
 
     print(f"\n{Colors.GREEN}Development setup complete!{Colors.ENDC}\n")
     installer.print_status("Next steps:")
@@ -577,8 +855,15 @@ def setup_development_environment(installer: Installer):
 def setup_production_environment(installer: Installer):
     """Set up the production environment."""
     installer.print_status("Setting up production deployment...")
-    installer.setup_production()
-    installer.create_documentation()
+
+    # The generated files are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        steps = [
+            executor.submit(installer.setup_production),
+            executor.submit(installer.create_documentation),
+        ]
+        for step in steps:
+            step.result()
     installer.initialize_git()
 
     print(f"\n{Colors.GREEN}Production setup complete!{Colors.ENDC}\n")
@@ -589,29 +874,69 @@ def setup_production_environment(installer: Installer):
     print("4. Users can install from your repository")
 
 
-def main():
-    """Main entry point for the installation script."""
-    parser = argparse.ArgumentParser(
-        description="Komodo Periphery Home Assistant Add-on Installation Script"
-    )
-    parser.add_argument(
-        "--dev", action="store_true", help="Set up development environment (default)"
-    )
-    parser.add_argument(
-        "--production", action="store_true", help="Set up production deployment files"
+USAGE = """usage: install.py [-h] [--dev] [--production] [-y] [--ha-config PATH]
+
+Komodo Periphery Home Assistant Add-on Installation Script
+
+options:
+  -h, --help        show this help message and exit
+  --dev             Set up development environment (default)
+  --production      Set up production deployment files
+  -y, --assume-yes  Never prompt; also enabled by KOMODO_INSTALL_YES=1
+  --ha-config PATH  Home Assistant config directory (or HA_CONFIG_PATH)
+"""
+
+
+def _usage_error(message: str):
+    """Print a usage error and exit with argparse's status code."""
+    sys.stderr.write(USAGE.split("\n", 1)[0] + "\n")
+    sys.stderr.write(f"install.py: error: {message}\n")
+    sys.exit(2)
+
+
+def parse_args(argv: List[str]) -> SimpleNamespace:
+    """Parse command line flags without the startup cost of argparse."""
+    args = SimpleNamespace(
+        dev=False, production=False, assume_yes=False, ha_config=None
     )
 
-    args = parser.parse_args()
+    remaining = iter(argv)
+    for arg in remaining:
+        if arg in ("-h", "--help"):
+            print(USAGE, end="")
+            sys.exit(0)
+        if arg == "--dev":
+            args.dev = True
+        elif arg == "--production":
+            args.production = True
+        elif arg in ("-y", "--assume-yes"):
+            args.assume_yes = True
+        elif arg == "--ha-config":
+            # Like argparse, a following flag is not taken as the value
+            args.ha_config = next(remaining, None)
+            if args.ha_config is None or args.ha_config.startswith("-"):
+                _usage_error("argument --ha-config: expected one argument")
+        elif arg.startswith("--ha-config="):
+            args.ha_config = arg.split("=", 1)[1]
+        else:
+            _usage_error(f"unrecognized arguments: {arg}")
+
+    return args
+
+
+def main():
+    """Main entry point for the installation script."""
+    args = parse_args(sys.argv[1:])
 
     # Default to dev mode if neither specified
     if not args.dev and not args.production:
         args.dev = True
 
-    installer = Installer()
+    installer = Installer(assume_yes=args.assume_yes, ha_config=args.ha_config)
     installer.print_header()
 
     try:
-        installer.install_dependencies()
+        installer.install_dependencies(prefetch_base_image=args.dev)
 
         if args.dev:
             setup_development_environment(installer)
@@ -632,6 +957,9 @@ def main():
     except Exception as e:  # pylint: disable=broad-exception-caught
         installer.print_error(f"Installation failed with unexpected error: {e}")
         sys.exit(1)
+    finally:
+        # Never leave a docker pull running behind the installer
+        installer.finish_base_image_pull()
 
 
 if __name__ == "__main__":
@@ -3,38 +3,190 @@ Pytest configuration and fixtures for Komodo Periphery Add-on testing.
 Updated to support both basic and integration tests.
 """
 
-import shutil
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Generator
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
 
-import docker
 import pytest
 import yaml
 
+if TYPE_CHECKING:
+    import docker
+
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 # Test configuration
-TEST_TIMEOUT = 60
+TEST_TIMEOUT = 120  # default per-test limit with pytest-timeout
+TIMEOUT_EXIT_CODE = 124  # exit status of timeout(1) when it kills the command
 ADDON_NAME = "komodo-periphery"
 ADDON_SLUG = "komodo_periphery"
 
+# Base image for the throwaway containers used by the integration tests
+ALPINE_IMAGE = "alpine:latest"
+
+# In-memory /tmp for the Alpine containers, where the test scripts do their work
+ALPINE_TMPFS = {"/tmp": "rw,size=64m"}
+
+# Alpine plus the scripts in tests/fixtures/periphery-test, tagged by content
+PERIPHERY_TEST_REPO = "periphery-test"
+PERIPHERY_TEST_SOURCES = ("tests/fixtures/periphery-test",)
+
+# Docker SDK connection settings shared by every test in the session
+DOCKER_CLIENT_TIMEOUT = 120
+DOCKER_MAX_POOL_SIZE = 32
+
+# Label put on containers started by fixtures so cleanup can filter on it
+TEST_LABEL = "komodo-test"
+CLEANUP_WORKERS = 16
+
+# pytest-xdist worker running this process (gw0, gw1, ...); "master" without -n
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+# Set once any process in the run has connected to Docker; workers report it
+# to the controller through xdist's workeroutput
+DOCKER_USED = pytest.StashKey[bool]()
+DOCKER_USED_OUTPUT = "komodo_docker_used"
+
+# In-memory mounts for the shared periphery container; contents are discarded
+PERIPHERY_TMPFS = {
+    "/tmp": "rw,size=64m",
+    "/var/log": "rw,size=32m",
+    "/data": "rw,size=64m",
+}
+PERIPHERY_SHM_SIZE = "128m"
+
+# Run inside the shared periphery container to give each test a clean slate
+PERIPHERY_RESET_SCRIPT = "rm -rf /tmp/test-* /data/state && mkdir -p /data/state"
+
+# Host tmpfs used for test scratch files on Linux
+SHM_DIR = "/dev/shm"
+
+# Optional registry ref to seed BuildKit's layer cache, e.g. in CI
+BUILD_CACHE_REF = os.environ.get("KOMODO_TEST_BUILD_CACHE")
+
+# Files whose contents determine the test image (see COPY in the Dockerfile)
+IMAGE_SOURCES = ("Dockerfile", "rootfs")
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, sig: tuple) -> Dict[str, Any]:
+    """Parse a YAML file, cached by path and (mtime, size) signature."""
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=YAML_LOADER)
+
+
+def load_yaml(path: Path, cache: Optional[pytest.Cache] = None) -> Dict[str, Any]:
+    """Load a YAML file, re-parsing only when it changed on disk.
+
+    With a pytest ``cache`` the parsed data also persists in .pytest_cache,
+    so later pytest runs skip the parse while the file is unchanged.
+    """
+    stat = path.stat()
+    sig = [stat.st_mtime_ns, stat.st_size]
+    key = f"komodo/yaml/{path.relative_to(project_root).as_posix()}"
+    if cache is not None:
+        entry = cache.get(key, None)
+        if entry and entry.get("sig") == sig:
+            return entry["data"]
+
+    data = _load_yaml_cached(str(path), tuple(sig))
+    # Only persist data that survives the JSON round trip unchanged
+    if cache is not None and json.loads(json.dumps(data, default=str)) == data:
+        cache.set(key, {"sig": sig, "data": data})
+    return data
+
+
+@functools.lru_cache(maxsize=1)
+def get_docker_client() -> docker.DockerClient:
+    """Connect to Docker once per process and check the daemon answers."""
+    # Imported here so tests that never touch Docker skip the SDK import
+    import docker
+
+    client = docker.from_env(
+        timeout=DOCKER_CLIENT_TIMEOUT, max_pool_size=DOCKER_MAX_POOL_SIZE
+    )
+    # Test connectivity
+    client.ping()
+    return client
+
 
 @pytest.fixture(scope="session")
 def docker_client() -> docker.DockerClient:
     """Provide Docker client for tests."""
     try:
-        client = docker.from_env()
-        # Test connectivity
-        client.ping()
-        return client
+        return get_docker_client()
     except Exception as e:
         pytest.skip(f"Docker not available: {e}")
 
 
+@pytest.fixture(scope="session")
+def alpine_image(docker_client: docker.DockerClient) -> str:
+    """Pull the Alpine image once so parallel tests don't race on it."""
+    if not docker_client.images.list(name=ALPINE_IMAGE):
+        docker_client.images.pull(ALPINE_IMAGE)
+    return ALPINE_IMAGE
+
+
+@pytest.fixture(scope="session")
+def periphery_test_image(docker_client: docker.DockerClient, alpine_image: str) -> str:
+    """Build the Alpine image with the basic integration scripts baked in."""
+    image_name = periphery_test_image_name()
+    if not docker_client.images.list(name=image_name):
+        docker_client.images.build(
+            path=str(project_root / PERIPHERY_TEST_SOURCES[0]),
+            tag=image_name,
+            labels={TEST_LABEL: "1"},
+            rm=True,
+        )
+    return image_name
+
+
+@pytest.fixture(scope="session")
+def alpine_shell(
+    docker_client: docker.DockerClient, alpine_image: str
+) -> Generator[docker.models.containers.Container, None, None]:
+    """Keep one idle Alpine container running for tests to exec scripts in.
+
+    Each pytest-xdist worker gets its own, named after the worker.
+    """
+    with run_container(
+        docker_client,
+        alpine_image,
+        command=["tail", "-f", "/dev/null"],
+        name=f"{ADDON_SLUG}_shell_{XDIST_WORKER}_{os.getpid()}",
+        host_config=docker_client.api.create_host_config(tmpfs=ALPINE_TMPFS),
+        labels={TEST_LABEL: "1"},
+    ) as container:
+        yield container
+
+
 @pytest.fixture(scope="session")
 def project_root_path() -> Path:
     """Provide project root path."""
@@ -42,190 +194,206 @@ def project_root_path() -> Path:
 
 
 @pytest.fixture(scope="session")
-def config_data() -> Dict[str, Any]:
+def config_data(pytestconfig: pytest.Config) -> Dict[str, Any]:
     """Load and provide add-on configuration data."""
     config_path = project_root / "config.yaml"
-    if not config_path.exists():
+    if not config_path.is_file():
         pytest.skip("config.yaml not found")
 
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+    return load_yaml(config_path, getattr(pytestconfig, "cache", None))
 
 
 @pytest.fixture(scope="session")
-def build_config_data() -> Dict[str, Any]:
+def build_config_data(pytestconfig: pytest.Config) -> Dict[str, Any]:
     """Load and provide build configuration data."""
     build_config_path = project_root / "build.yaml"
-    if not build_config_path.exists():
+    if not build_config_path.is_file():
         pytest.skip("build.yaml not found")
 
-    with open(build_config_path, "r") as f:
-        return yaml.safe_load(f)
+    return load_yaml(build_config_path, getattr(pytestconfig, "cache", None))
 
 
-@pytest.fixture
-def temp_dir() -> Generator[Path, None, None]:
-    """Provide temporary directory for tests."""
-    temp_path = Path(tempfile.mkdtemp())
-    try:
-        yield temp_path
-    finally:
-        shutil.rmtree(temp_path, ignore_errors=True)
+@pytest.fixture(scope="session")
+def option_keys(config_data: Dict[str, Any]) -> FrozenSet[str]:
+    """Provide the option names defined in config.yaml."""
+    return frozenset(config_data.get("options", {}))
 
 
-@pytest.fixture
-def mock_addon_config(temp_dir: Path) -> Path:
-    """Create mock add-on configuration for testing."""
-    config_content = {
-        "komodo_address": "https://test.example.com",
-        "komodo_api_key": "test-api-key",
-        "komodo_api_secret": "test-api-secret",
-        "log_level": "debug",
-        "stats_polling_rate": "5-sec",
-        "container_stats_polling_rate": "1-min",
-        "ssl_enabled": True,
-        "monitor_homeassistant": True,
-    }
+@pytest.fixture(scope="session")
+def schema_keys(config_data: Dict[str, Any]) -> FrozenSet[str]:
+    """Provide the schema field names defined in config.yaml."""
+    return frozenset(config_data.get("schema", {}))
 
-    config_file = temp_dir / "addon_config.yaml"
-    with open(config_file, "w") as f:
-        yaml.dump(config_content, f)
 
-    return config_file
+@pytest.fixture(scope="session")
+def required_schema_keys(config_data: Dict[str, Any]) -> FrozenSet[str]:
+    """Provide schema field names not marked optional with a trailing '?'."""
+    schema = config_data.get("schema", {})
+    return frozenset(
+        key
+        for key, value in schema.items()
+        if not (isinstance(value, str) and value.endswith("?"))
+    )
 
 
-@pytest.fixture
-def mock_periphery_config(temp_dir: Path) -> Path:
-    """Create mock Komodo Periphery configuration."""
-    config_content = """
-# Test Komodo Periphery Configuration
-port = 8120
-stats_polling_rate = "5-sec"
-container_stats_polling_rate = "1-min"
-ssl_enabled = true
-
-[logging]
-level = "debug"
-pretty = false
-"""
-    config_file = temp_dir / "periphery.config.toml"
-    config_file.write_text(config_content)
-    return config_file
+@pytest.fixture(scope="session")
+def valid_translation_keys(
+    option_keys: FrozenSet[str], schema_keys: FrozenSet[str]
+) -> FrozenSet[str]:
+    """Provide every key a configuration translation may describe."""
+    return option_keys | schema_keys
+
+
+@pytest.fixture(scope="session")
+def translation_data(pytestconfig: pytest.Config) -> Dict[str, Any]:
+    """Load and provide the English translation data."""
+    translation_path = project_root / "translations" / "en.yaml"
+    if not translation_path.is_file():
+        pytest.skip("translations/en.yaml not found")
+
+    return load_yaml(translation_path, getattr(pytestconfig, "cache", None))
+
+
+@functools.lru_cache(maxsize=None)
+def image_source_hash(sources: Tuple[str, ...] = IMAGE_SOURCES) -> str:
+    """Hash the files baked into the image so unchanged sources reuse it."""
+    digest = hashlib.blake2b(digest_size=8)
+    for source in sources:
+        root = project_root / source
+        paths = [root] if root.is_file() else sorted(root.rglob("*"))
+        for path in paths:
+            if path.is_file():
+                digest.update(path.relative_to(project_root).as_posix().encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def periphery_test_image_name() -> str:
+    """Name the periphery-test image after the fixture files it is built from."""
+    return f"{PERIPHERY_TEST_REPO}:{image_source_hash(PERIPHERY_TEST_SOURCES)}"
 
 
 @pytest.fixture(scope="session")
 def test_image_name() -> str:
     """Provide test Docker image name."""
-    return f"{ADDON_NAME}:test"
+    return f"{ADDON_NAME}:test-{image_source_hash()}"
 
 
 @pytest.fixture(scope="session")
 def build_test_image(
     docker_client: docker.DockerClient, test_image_name: str
 ) -> Generator[str, None, None]:
-    """Build test Docker image if Dockerfile exists."""
+    """Build the add-on test image unless one for the current sources exists."""
     dockerfile_path = project_root / "Dockerfile"
 
-    if not dockerfile_path.exists():
-        # If no Dockerfile, skip building and use Alpine for tests
-        yield "alpine:latest"
+    if docker_client.images.list(name=test_image_name):
+        # Sources are unchanged since this image was built
+        yield test_image_name
         return
 
     try:
-        print(f"Building test image: {test_image_name}")
-
-        # Build the image
-        image, logs = docker_client.images.build(
-            path=str(project_root),
-            tag=test_image_name,
-            dockerfile="Dockerfile",
-            buildargs={
-                "BUILD_ARCH": "amd64",
-                "BUILD_DATE": "2025-01-01T00:00:00Z",
-                "BUILD_REF": "test",
-                "BUILD_VERSION": "test",
-            },
-            rm=True,
+        subprocess.run(
+            ["docker", "buildx", "version"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip(f"docker buildx is required to build {test_image_name}")
+
+    print(f"Building test image: {test_image_name}")
+
+    # Build the image with BuildKit so layers are reused between runs
+    buildargs = {
+        "BUILD_ARCH": "amd64",
+        "BUILD_DATE": "2025-01-01T00:00:00Z",
+        "BUILD_REF": "test",
+        "BUILD_VERSION": "test",
+        "BUILDKIT_INLINE_CACHE": "1",
+    }
+    command = [
+        "docker",
+        "buildx",
+        "build",
+        "--load",
+        "--progress=plain",
+        "--cache-to=type=inline",
+        "--label",
+        f"{TEST_LABEL}=1",
+        "-t",
+        test_image_name,
+        "-f",
+        str(dockerfile_path),
+    ]
+    if BUILD_CACHE_REF:
+        command.append(f"--cache-from=type=registry,ref={BUILD_CACHE_REF}")
+    for key, value in buildargs.items():
+        command += ["--build-arg", f"{key}={value}"]
+    command.append(str(project_root))
+
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "DOCKER_BUILDKIT": "1"},
+    ) as build:
+        # Keep only errors/warnings while the log streams past
+        notable = [
+            line.strip()
+            for line in build.stderr
+            if "error" in line.lower() or "warning" in line.lower()
+        ]
+
+    # Print build logs for debugging in one write
+    if notable:
+        sys.stdout.write("\n".join(notable) + "\n")
+
+    # A broken build must not pass as a run against some other image
+    if build.returncode:
+        pytest.fail(
+            f"Failed to build {test_image_name} (exit {build.returncode})",
+            pytrace=False,
         )
 
-        # Print build logs for debugging (only errors/warnings)
-        for log in logs:
-            if "stream" in log:
-                line = log["stream"].strip()
-                if line and ("error" in line.lower() or "warning" in line.lower()):
-                    print(line)
-
-        yield test_image_name
-
-    except Exception as e:
-        print(f"Failed to build test image: {e}")
-        # Fallback to Alpine
-        yield "alpine:latest"
-    finally:
-        # Cleanup: Remove test image
-        try:
-            docker_client.images.remove(test_image_name, force=True)
-            print(f"Cleaned up test image: {test_image_name}")
-        except:
-            pass
-
-
-@pytest.fixture
-def clean_docker_environment(docker_client: docker.DockerClient):
-    """Ensure clean Docker environment for tests."""
-    # Clean up any existing test containers
-    try:
-        containers = docker_client.containers.list(
-            all=True, filters={"name": "test"})
-        for container in containers:
-            try:
-                container.remove(force=True)
-            except:
-                pass
-    except:
-        pass
-
-    yield
+    yield test_image_name
 
-    # Cleanup after test
-    try:
-        containers = docker_client.containers.list(
-            all=True, filters={"name": "test"})
-        for container in containers:
-            try:
-                container.remove(force=True)
-            except:
-                pass
-    except:
-        pass
 
+# Environment every test runs with; no test changes these values
+TEST_ENV = {
+    "PYTEST_RUNNING": "1",
+    "KOMODO_ADDRESS": "https://test.example.com",
+    "KOMODO_API_KEY": "test-api-key",
+    "KOMODO_API_SECRET": "test-api-secret",
+    "PERIPHERY_LOG_LEVEL": "debug",
+    "PERIPHERY_SSL_ENABLED": "false",  # Disable SSL for testing
+    "PERIPHERY_STATS_POLLING_RATE": "10-sec",
+    "PERIPHERY_CONTAINER_STATS_POLLING_RATE": "1-min",
+}
 
-@pytest.fixture(autouse=True)
-def setup_test_environment(monkeypatch):
-    """Set up test environment variables."""
-    test_env = {
-        "PYTEST_RUNNING": "1",
-        "KOMODO_ADDRESS": "https://test.example.com",
-        "KOMODO_API_KEY": "test-api-key",
-        "KOMODO_API_SECRET": "test-api-secret",
-        "PERIPHERY_LOG_LEVEL": "debug",
-        "PERIPHERY_SSL_ENABLED": "false",  # Disable SSL for testing
-        "PERIPHERY_STATS_POLLING_RATE": "10-sec",
-        "PERIPHERY_CONTAINER_STATS_POLLING_RATE": "1-min",
-    }
 
-    for key, value in test_env.items():
-        monkeypatch.setenv(key, value)
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_environment() -> Generator[None, None, None]:
+    """Set up test environment variables once for the session."""
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in TEST_ENV.items():
+            mp.setenv(key, value)
+        yield
 
 
 # Legacy fixtures for compatibility with existing integration tests
-@pytest.fixture
+@pytest.fixture(scope="session")
 def komodo_periphery_container(
     build_test_image: str, docker_client: docker.DockerClient
 ):
     """
     Legacy fixture for compatibility with old integration tests.
-    Creates a simple container wrapper.
+    Creates a simple container wrapper, started once and shared by the session.
+    Under pytest-xdist every worker is its own session, so each gets a
+    separate container named after the worker.
+
+    /tmp, /var/log and /data are tmpfs mounts: writes skip the disk, but
+    nothing written there outlives the container.
     """
 
     class SimpleContainerWrapper:
@@ -239,8 +407,11 @@ def komodo_periphery_container(
             if not self.container:
                 self.container = self.client.containers.run(
                     self.image_name,
-                    command=["sh", "-c",
-                             'echo "Test container started" && sleep 30'],
+                    command=[
+                        "sh",
+                        "-c",
+                        'echo "Test container started" && exec tail -f /dev/null',
+                    ],
                     detach=True,
                     remove=False,
                     environment={
@@ -248,7 +419,11 @@ def komodo_periphery_container(
                         "KOMODO_API_KEY": "test-key",
                         "KOMODO_API_SECRET": "test-secret",
                     },
+                    name=f"{ADDON_SLUG}_test_{XDIST_WORKER}_{os.getpid()}",
                     ports={"8120/tcp": None},
+                    tmpfs=PERIPHERY_TMPFS,
+                    shm_size=PERIPHERY_SHM_SIZE,
+                    labels={TEST_LABEL: "1"},
                 )
             return self.container
 
@@ -267,11 +442,15 @@ def komodo_periphery_container(
             except:
                 return port
 
-        def get_logs(self):
-            """Get container logs."""
+        def get_logs(self, tail="all"):
+            """Get container logs, or only the last ``tail`` lines.
+
+            The container lives for the whole session, so pass a line count
+            when only recent output matters.
+            """
             if not self.container:
                 self.start_container()
-            return self.container.logs()
+            return self.container.logs(tail=tail)
 
         def get_docker_client(self):
             """Get Docker client."""
@@ -284,18 +463,28 @@ def komodo_periphery_container(
             return self.container
 
         def exec_run(self, command, timeout=30):
-            """Execute command in container."""
+            """Execute command in container.
+
+            Raises TimeoutError if the command is killed after ``timeout``
+            seconds instead of returning its partial output.
+            """
             if not self.container:
                 self.start_container()
+            if isinstance(command, str):
+                command = ["sh", "-c", command]
             try:
-                result = self.container.exec_run(command, timeout=timeout)
-                return result.exit_code, result.output
+                # docker-py's exec_run has no timeout; enforce it in-container
+                result = self.container.exec_run(["timeout", str(timeout), *command])
             except Exception as e:
                 return 1, str(e).encode()
+            if result.exit_code == TIMEOUT_EXIT_CODE:
+                raise TimeoutError(f"{command!r} timed out after {timeout}s")
+            return result.exit_code, result.output
 
         def cleanup(self):
             """Clean up container."""
             if self.container:
+                _IP_CACHE.pop(self.container.id, None)
                 try:
                     self.container.remove(force=True)
                 except:
@@ -307,94 +496,250 @@ def komodo_periphery_container(
     wrapper.cleanup()
 
 
+@pytest.fixture
+def clean_periphery_state(komodo_periphery_container):
+    """Reset scratch state in the shared container before each test."""
+    exit_code, output = komodo_periphery_container.exec_run(PERIPHERY_RESET_SCRIPT)
+    assert exit_code == 0, f"State reset failed: {output!r}"
+    return komodo_periphery_container
+
+
+def pytest_addoption(parser):
+    """Add the --runslow option."""
+    parser.addoption(
+        "--runslow", action="store_true", default=False, help="run tests marked slow"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
 def pytest_configure(config):
     """Configure pytest with custom markers."""
-    config.addinivalue_line(
-        "markers", "integration: mark test as integration test")
+    # Runs before pytest-timeout reads its settings; explicit values win
+    if (
+        config.pluginmanager.hasplugin("timeout")
+        and config.getoption("timeout") is None
+        and "PYTEST_TIMEOUT" not in os.environ
+        and not config.getini("timeout")
+    ):
+        config.option.timeout = TEST_TIMEOUT
+
+    # Keep tmp_path and tempfile scratch files on tmpfs; this has to happen
+    # before tempfile.gettempdir() caches its answer
+    if sys.platform == "linux" and os.path.isdir(SHM_DIR):
+        os.environ["TMPDIR"] = SHM_DIR
+        tempfile.tempdir = SHM_DIR
+
+    config.addinivalue_line("markers", "integration: mark test as integration test")
     config.addinivalue_line("markers", "slow: mark test as slow running")
     config.addinivalue_line("markers", "docker: mark test as requiring Docker")
-    config.addinivalue_line(
-        "markers", "network: mark test as requiring network access")
+    config.addinivalue_line("markers", "network: mark test as requiring network access")
     config.addinivalue_line("markers", "unit: mark test as unit test")
 
 
+# Node id keywords and the markers they imply
+_MARKER_KEYWORDS = {
+    "integration": ("integration", "slow"),
+    "docker": ("docker",),
+    "container": ("docker",),
+    "network": ("network",),
+    "api": ("network",),
+    "build": ("slow",),
+    "security": ("slow",),
+    "performance": ("slow",),
+}
+# Lookahead so overlapping keywords in one node id are all found
+_MARKER_RE = re.compile(f"(?=({'|'.join(_MARKER_KEYWORDS)}))")
+
+
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers based on test names."""
+    # Slow tests are opt-in; only declared marks count, not inferred ones
+    if not config.getoption("runslow"):
+        skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+        for item in items:
+            if "slow" in item.keywords:
+                item.add_marker(skip_slow)
+
+    # Inferred markers only feed -m selection; skip the scan without one
+    if not config.getoption("markexpr"):
+        return
+
+    marks = {
+        name: getattr(pytest.mark, name)
+        for name in ("integration", "docker", "network", "slow", "unit")
+    }
     for item in items:
-        # Add integration marker to integration tests
-        if "integration" in item.nodeid:
-            item.add_marker(pytest.mark.integration)
+        keywords = set(_MARKER_RE.findall(item.nodeid))
+        names = {name for kw in keywords for name in _MARKER_KEYWORDS[kw]}
 
-        # Add docker marker to docker-related tests
-        if "docker" in item.nodeid or "container" in item.nodeid:
-            item.add_marker(pytest.mark.docker)
+        # Add unit marker to non-integration tests
+        if not keywords & {"integration", "docker"}:
+            names.add("unit")
 
-        # Add network marker to network tests
-        if "network" in item.nodeid or "api" in item.nodeid:
-            item.add_marker(pytest.mark.network)
+        for name in names:
+            item.add_marker(marks[name])
 
-        # Add slow marker to potentially slow tests
-        if any(
-            keyword in item.nodeid
-            for keyword in ["build", "security", "integration", "performance"]
-        ):
-            item.add_marker(pytest.mark.slow)
 
-        # Add unit marker to non-integration tests
-        if "integration" not in item.nodeid and "docker" not in item.nodeid:
-            item.add_marker(pytest.mark.unit)
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Note on the xdist controller when a worker has used Docker."""
+    if node.workeroutput.get(DOCKER_USED_OUTPUT):
+        node.config.stash[DOCKER_USED] = True
 
 
-@pytest.fixture(scope="session", autouse=True)
-def cleanup_test_environment():
-    """Clean up test environment after session."""
-    yield
+def pytest_sessionfinish(session, exitstatus):
+    """Clean up test Docker resources once the whole run has finished."""
+    # Only sweep when this run connected to Docker; unit-only runs never
+    # import the SDK or wait on a daemon
+    docker_used = get_docker_client.cache_info().currsize > 0
+
+    # Under xdist only the controller sweeps, after every worker is done;
+    # a worker sweeping would remove containers its siblings still use
+    if XDIST_WORKER != "master":
+        if docker_used:
+            session.config.workeroutput[DOCKER_USED_OUTPUT] = True
+        return
+    if not (docker_used or session.config.stash.get(DOCKER_USED, False)):
+        return
 
     # Cleanup Docker resources if available
     try:
-        client = docker.from_env()
+        client = get_docker_client()
 
         # Remove test containers
-        containers = client.containers.list(all=True)
-        for container in containers:
-            if container.name and "test" in container.name.lower():
-                try:
-                    container.remove(force=True)
-                except Exception:
-                    pass
-
-        # Remove test images with test tags
-        images = client.images.list()
-        for image in images:
-            for tag in image.tags:
-                if "test" in tag.lower():
-                    try:
-                        client.images.remove(image.id, force=True)
-                    except Exception:
-                        pass
+        remove_test_containers(client)
+
+        # Remove test images built from older sources; keep the current ones
+        keep = {
+            f"{ADDON_NAME}:test-{image_source_hash()}",
+            periphery_test_image_name(),
+        }
+        images = client.images.list(filters={"label": f"{TEST_LABEL}=1"})
+        _remove_concurrently(
+            functools.partial(client.images.remove, image.id, force=True)
+            for image in images
+            if keep.isdisjoint(image.tags)
+        )
 
     except Exception:
         # Docker not available or other error - ignore
         pass
 
 
+def _remove_concurrently(removals: Iterable[Callable[[], Any]]) -> None:
+    """Run Docker remove calls in parallel, ignoring individual failures."""
+
+    def attempt(remove: Callable[[], Any]) -> None:
+        try:
+            remove()
+        except Exception:
+            pass
+
+    with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as pool:
+        list(pool.map(attempt, removals))
+
+
+def remove_test_containers(client: docker.DockerClient) -> None:
+    """Force-remove containers carrying the test label in parallel."""
+    try:
+        containers = client.containers.list(
+            all=True, filters={"label": f"{TEST_LABEL}=1"}
+        )
+    except Exception:
+        return
+
+    _remove_concurrently(
+        functools.partial(container.remove, force=True) for container in containers
+    )
+
+
 # Test helpers
 def wait_for_condition(condition_func, timeout=30, interval=1):
-    """Wait for a condition to be true."""
+    """Wait for a condition to be true, backing off up to ``interval``."""
     import time
 
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+    deadline = time.monotonic() + timeout
+    delay = 0.005
+    while time.monotonic() < deadline:
         if condition_func():
             return True
-        time.sleep(interval)
+        time.sleep(delay)
+        delay = min(delay * 2, interval)
     return False
 
 
+def start_container(
+    client: docker.DockerClient, image: str, **kwargs: Any
+) -> docker.models.containers.Container:
+    """Create and start a detached container through the low-level API.
+
+    containers.run() inspects the new container before starting it; going
+    straight to create/start skips that round-trip. ``kwargs`` are passed to
+    ``APIClient.create_container``.
+    """
+    container_id = client.api.create_container(image, **kwargs)["Id"]
+    client.api.start(container_id)
+    return client.containers.prepare_model({"Id": container_id})
+
+
+@contextmanager
+def run_container(
+    client: docker.DockerClient, image: str, **kwargs: Any
+) -> Iterator[docker.models.containers.Container]:
+    """Run a detached container for the duration of a with block."""
+    import docker
+
+    container = start_container(client, image, **kwargs)
+    try:
+        yield container
+    finally:
+        try:
+            container.remove(force=True)
+        except docker.errors.APIError:
+            pass
+
+
+def collect_logs(container, until: Optional[bytes] = None) -> bytes:
+    """Follow a container's logs, returning early once ``until`` appears."""
+    logs = bytearray()
+    stream = container.logs(stream=True, follow=True)
+    try:
+        for chunk in stream:
+            logs += chunk
+            if until is not None and until in logs:
+                break
+    finally:
+        stream.close()
+    return bytes(logs)
+
+
+@functools.lru_cache(maxsize=None)
+def _marker_pattern(markers: Tuple[str, ...]) -> re.Pattern:
+    """Compile one alternation for a set of log markers."""
+    # Lookahead so overlapping markers are all found
+    return re.compile(f"(?=({'|'.join(map(re.escape, markers))}))")
+
+
+def missing_markers(logs: str, markers: Tuple[str, ...]) -> FrozenSet[str]:
+    """Return the markers that do not appear in ``logs``, in one regex pass."""
+    found = set(_marker_pattern(markers).findall(logs))
+    # Markers starting at the same offset yield one match; re-check misses
+    return frozenset(m for m in markers if m not in found and m not in logs)
+
+
+# Container id -> IP address, filled by get_container_ip
+_IP_CACHE: Dict[str, str] = {}
+
+
 def get_container_ip(container):
-    """Get container IP address."""
+    """Get container IP address, cached per container id."""
+    if container.id in _IP_CACHE:
+        return _IP_CACHE[container.id]
     try:
         container.reload()
-        return container.attrs["NetworkSettings"]["IPAddress"]
+        ip = container.attrs["NetworkSettings"]["IPAddress"]
     except:
         return None
+    if ip:
+        _IP_CACHE[container.id] = ip
+    return ip
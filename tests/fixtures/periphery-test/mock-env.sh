@@ -0,0 +1,40 @@
+#!/bin/sh
+set -euo pipefail
+echo "=== Komodo Periphery Environment Test ==="
+
+# Validate required environment variables
+if [ -z "${KOMODO_ADDRESS:-}" ] || [ -z "${KOMODO_API_KEY:-}" ] || [ -z "${KOMODO_API_SECRET:-}" ]; then
+    echo "ERROR: Missing required environment variables"
+    exit 1
+fi
+
+# Check environment variables
+echo "Environment variables:"
+echo "KOMODO_ADDRESS: $KOMODO_ADDRESS"
+echo "KOMODO_API_KEY: ${KOMODO_API_KEY:0:8}..." # Show only first 8 chars
+echo "KOMODO_API_SECRET: ${KOMODO_API_SECRET:0:8}..."
+
+# Use /tmp instead of /data to avoid permission conflicts
+WORK_DIR="/tmp/periphery_test"
+# Only list the working directory when a later step fails
+trap '[ $? -eq 0 ] || ls -la "$WORK_DIR"' EXIT
+echo "Creating working directory: $WORK_DIR"
+mkdir -p "$WORK_DIR/ssl"
+
+# The configuration is baked into the image
+CONFIG_FILE="/etc/periphery/periphery.config.toml"
+test -f "$CONFIG_FILE"
+echo "✓ Configuration file found"
+echo "Configuration content:"
+cat "$CONFIG_FILE"
+
+# testuser is created when the image is built
+echo "Testing user management..."
+id testuser
+
+# Test file permissions in our working directory
+echo "Testing file permissions..."
+touch "$WORK_DIR/test_file"
+echo "✓ File creation successful"
+
+echo "=== Test completed successfully ==="
@@ -2,10 +2,22 @@
 Tests for add-on configuration validation.
 """
 
+import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet
 
-import yaml
+import pytest
+
+# "[item]" list, "list(a|b)" enum or base type, each optionally "?"-suffixed
+SCHEMA_TYPE_RE = re.compile(r"(?:\[(?P<item>[^\]]+)\]|list\(.+\)|(?P<base>[^?]+))\?*")
+VALID_ARCHS = frozenset(("aarch64", "amd64", "armhf", "armv7", "i386"))
+VALID_STARTUP = frozenset(("before", "after", "once", "services", "system"))
+VALID_BOOT = frozenset(("auto", "manual"))
+VALID_PRIVILEGES = frozenset(("SYS_ADMIN", "NET_ADMIN", "SYS_TIME", "DAC_READ_SEARCH"))
+VALID_PROTOCOLS = frozenset(("tcp", "udp"))
+VALID_SCHEMA_TYPES = frozenset(
+    ("str", "password", "int", "float", "bool", "url", "email")
+)
 
 
 class TestAddonConfig:
@@ -14,7 +26,7 @@ class TestAddonConfig:
     def test_config_file_exists(self, project_root_path: Path):
         """Test that config.yaml exists."""
         config_path = project_root_path / "config.yaml"
-        assert config_path.exists(), "config.yaml file must exist"
+        assert config_path.is_file(), "config.yaml file must exist"
 
     def test_config_is_valid_yaml(self, config_data: Dict[str, Any]):
         """Test that config.yaml is valid YAML."""
@@ -51,28 +63,25 @@ class TestAddonConfig:
 
     def test_supported_architectures(self, config_data: Dict[str, Any]):
         """Test supported architectures are valid."""
-        valid_archs = ["aarch64", "amd64", "armhf", "armv7", "i386"]
         supported_archs = config_data.get("arch", [])
 
         assert isinstance(supported_archs, list), "Architectures must be a list"
         assert len(supported_archs) > 0, "At least one architecture must be supported"
 
-        for arch in supported_archs:
-            assert arch in valid_archs, f"Invalid architecture: {arch}"
+        invalid = set(supported_archs) - VALID_ARCHS
+        assert not invalid, f"Invalid architectures: {sorted(invalid)}"
 
     def test_startup_configuration(self, config_data: Dict[str, Any]):
         """Test startup configuration."""
-        valid_startup_types = ["before", "after", "once", "services", "system"]
         startup = config_data.get("startup")
 
-        assert startup in valid_startup_types, f"Invalid startup type: {startup}"
+        assert startup in VALID_STARTUP, f"Invalid startup type: {startup}"
 
     def test_boot_configuration(self, config_data: Dict[str, Any]):
         """Test boot configuration."""
-        valid_boot_types = ["auto", "manual"]
         boot = config_data.get("boot")
 
-        assert boot in valid_boot_types, f"Invalid boot type: {boot}"
+        assert boot in VALID_BOOT, f"Invalid boot type: {boot}"
 
     def test_ports_configuration(self, config_data: Dict[str, Any]):
         """Test ports configuration."""
@@ -83,12 +92,10 @@ class TestAddonConfig:
 
             for port_def, port_num in ports.items():
                 # Test port definition format
-                assert (
-                    "/" in port_def
-                ), f"Port definition must include protocol: {port_def}"
-                port, protocol = port_def.split("/")
+                port, sep, protocol = port_def.partition("/")
+                assert sep, f"Port definition must include protocol: {port_def}"
                 assert port.isdigit(), f"Port must be numeric: {port}"
-                assert protocol in ["tcp", "udp"], f"Invalid protocol: {protocol}"
+                assert protocol in VALID_PROTOCOLS, f"Invalid protocol: {protocol}"
 
                 # Test port number
                 assert isinstance(
@@ -96,21 +103,22 @@ class TestAddonConfig:
                 ), f"Port number must be integer: {port_num}"
                 assert 1 <= port_num <= 65535, f"Invalid port number: {port_num}"
 
-    def test_options_schema_consistency(self, config_data: Dict[str, Any]):
+    def test_options_schema_consistency(
+        self,
+        option_keys: FrozenSet[str],
+        schema_keys: FrozenSet[str],
+        required_schema_keys: FrozenSet[str],
+    ):
         """Test that options and schema are consistent."""
-        options = config_data.get("options", {})
-        schema = config_data.get("schema", {})
-
         # All options should have corresponding schema entries
-        for option_key in options.keys():
-            assert option_key in schema, f"Option '{option_key}' missing from schema"
+        missing = option_keys - schema_keys
+        assert not missing, f"Options missing from schema: {sorted(missing)}"
 
         # All schema entries should have default values in options (except optional ones)
-        for schema_key, schema_def in schema.items():
-            if not str(schema_def).endswith("?"):  # Not optional
-                assert (
-                    schema_key in options
-                ), f"Required schema field '{schema_key}' missing from options"
+        missing = required_schema_keys - option_keys
+        assert (
+            not missing
+        ), f"Required schema fields missing from options: {sorted(missing)}"
 
     def test_required_options(self, config_data: Dict[str, Any]):
         """Test that required options are present."""
@@ -127,42 +135,26 @@ class TestAddonConfig:
 
         options = config_data.get("options", {})
 
-        for option in required_options:
-            assert option in options, f"Required option '{option}' missing"
+        missing = set(required_options) - options.keys()
+        assert not missing, f"Required options missing: {sorted(missing)}"
 
     def test_schema_types(self, config_data: Dict[str, Any]):
         """Test schema type definitions."""
         schema = config_data.get("schema", {})
-        valid_types = ["str", "password", "int", "float", "bool", "url", "email"]
 
         for field, field_type in schema.items():
             if isinstance(field_type, str):
-                # Handle optional types ending with ?
-                base_type = field_type.rstrip("?")
-
-                # Handle list types like [str]? or [password]?
-                if base_type.startswith("[") and base_type.endswith("]"):
-                    # Extract the inner type from [type]
-                    inner_type = base_type[1:-1]
-                    # Handle enum types like [option1|option2]
-                    if "|" in inner_type:
-                        continue
-                    assert (
-                        inner_type in valid_types
-                    ), f"Invalid list schema type for '{field}': {field_type}"
-                    continue
+                match = SCHEMA_TYPE_RE.fullmatch(field_type)
+                assert match, f"Invalid schema type for '{field}': {field_type}"
 
-                # Handle list types like list(option1|option2|option3)
-                if base_type.startswith("list(") and base_type.endswith(")"):
-                    continue
-
-                # Handle enum types with | separator
-                if "|" in base_type:
+                # Enums like list(a|b) or [a|b] have no base type to check
+                type_name = match["item"] or match["base"]
+                if type_name is None or "|" in type_name:
                     continue
 
                 # Validate basic types
                 assert (
-                    base_type in valid_types
+                    type_name in VALID_SCHEMA_TYPES
                 ), f"Invalid schema type for '{field}': {field_type}"
 
     def test_environment_mapping(self, config_data: Dict[str, Any]):
@@ -192,33 +184,28 @@ class TestAddonConfig:
 
         if privileged:
             assert isinstance(privileged, list), "Privileged must be a list"
-            valid_privileges = ["SYS_ADMIN", "NET_ADMIN", "SYS_TIME", "DAC_READ_SEARCH"]
 
             for privilege in privileged:
-                assert privilege in valid_privileges, f"Invalid privilege: {privilege}"
-
-    def test_docker_api_access(self, config_data: Dict[str, Any]):
-        """Test Docker API access configuration."""
-        docker_api = config_data.get("docker_api")
-
-        # Should be enabled for container management
-        assert docker_api is True, "Docker API access should be enabled"
-
-    def test_network_configuration(self, config_data: Dict[str, Any]):
-        """Test network configuration."""
-        host_network = config_data.get("host_network", False)
-        host_pid = config_data.get("host_pid", False)
-
-        # For security, these should typically be False
-        assert host_network is False, "Host network should be disabled for security"
-        assert host_pid is False, "Host PID should be disabled for security"
-
-    def test_apparmor_configuration(self, config_data: Dict[str, Any]):
-        """Test AppArmor configuration."""
-        apparmor = config_data.get("apparmor")
-
-        # AppArmor should be enabled for security
-        assert apparmor is True, "AppArmor should be enabled for security"
+                assert privilege in VALID_PRIVILEGES, f"Invalid privilege: {privilege}"
+
+    @pytest.mark.parametrize(
+        "key,expected",
+        [
+            # Should be enabled for container management
+            ("docker_api", True),
+            # For security, these should typically be False
+            ("host_network", False),
+            ("host_pid", False),
+            # AppArmor should be enabled for security
+            ("apparmor", True),
+        ],
+    )
+    def test_security_settings(
+        self, config_data: Dict[str, Any], key: str, expected: bool
+    ):
+        """Test Docker API, host namespace and AppArmor settings."""
+        value = config_data.get(key, False)
+        assert value is expected, f"'{key}' should be {expected}, got {value!r}"
 
     def test_services_configuration(self, config_data: Dict[str, Any]):
         """Test services configuration."""
@@ -244,7 +231,7 @@ class TestBuildConfig:
     def test_build_config_exists(self, project_root_path: Path):
         """Test that build.yaml exists."""
         build_config_path = project_root_path / "build.yaml"
-        assert build_config_path.exists(), "build.yaml file must exist"
+        assert build_config_path.is_file(), "build.yaml file must exist"
 
     def test_build_config_is_valid_yaml(self, build_config_data: Dict[str, Any]):
         """Test that build.yaml is valid YAML."""
@@ -264,19 +251,19 @@ class TestBuildConfig:
         assert len(build_from) > 0, "build_from must not be empty"
 
         # All supported architectures should have base images
-        for arch in supported_archs:
-            assert arch in build_from, f"Missing base image for architecture: {arch}"
-
-            base_image = build_from[arch]
-            assert isinstance(
-                base_image, str
-            ), f"Base image for {arch} must be a string"
-            assert len(base_image) > 0, f"Base image for {arch} must not be empty"
-
-            # Should use official Home Assistant base images
-            assert (
-                "home-assistant" in base_image
-            ), f"Should use HA base image for {arch}"
+        missing = set(supported_archs) - build_from.keys()
+        assert not missing, f"Missing base images for architectures: {sorted(missing)}"
+
+        # Should be non-empty strings naming official Home Assistant base images
+        bad = [
+            arch
+            for arch in supported_archs
+            if not (
+                isinstance(build_from[arch], str)
+                and "home-assistant" in build_from[arch]
+            )
+        ]
+        assert not bad, f"Should use HA base image for: {bad}"
 
     def test_build_args(self, build_config_data: Dict[str, Any]):
         """Test build arguments configuration."""
@@ -305,12 +292,13 @@ class TestBuildConfig:
                 "org.opencontainers.image.licenses",
             ]
 
-            for label in required_labels:
-                if label in labels:
-                    assert isinstance(
-                        labels[label], str
-                    ), f"Label {label} must be a string"
-                    assert len(labels[label]) > 0, f"Label {label} must not be empty"
+            bad = [
+                label
+                for label in required_labels
+                if label in labels
+                and not (isinstance(labels[label], str) and labels[label])
+            ]
+            assert not bad, f"Labels must be non-empty strings: {bad}"
 
 
 class TestTranslations:
@@ -319,20 +307,17 @@ class TestTranslations:
     def test_english_translation_exists(self, project_root_path: Path):
         """Test that English translation exists."""
         translation_path = project_root_path / "translations" / "en.yaml"
-        assert translation_path.exists(), "English translation file must exist"
+        assert translation_path.is_file(), "English translation file must exist"
 
     def test_translation_structure(
-        self, project_root_path: Path, config_data: Dict[str, Any]
+        self,
+        translation_data: Dict[str, Any],
+        option_keys: FrozenSet[str],
+        required_schema_keys: FrozenSet[str],
+        valid_translation_keys: FrozenSet[str],
     ):
         """Test translation file structure."""
-        translation_path = project_root_path / "translations" / "en.yaml"
-
-        assert (
-            translation_path.exists()
-        ), f"Translation file must exist at: {translation_path}"
-
-        with open(translation_path, "r", encoding="utf-8") as f:
-            translations = yaml.safe_load(f)
+        translations = translation_data
 
         assert translations is not None, "Translation file must contain valid YAML"
         assert isinstance(translations, dict), "Translations must be a dictionary"
@@ -345,15 +330,19 @@ class TestTranslations:
             config_translations, dict
         ), "Configuration translations must be a dictionary"
 
-        options = config_data.get("options", {})
-        schema = config_data.get("schema", {})
-
-        # All options should have translations
-        for option_key in options.keys():
-            assert (
-                option_key in config_translations
-            ), f"Missing translation for option: {option_key}"
+        translated = config_translations.keys()
+        key_problems = {
+            # All options should have translations
+            "missing for options": option_keys - translated,
+            # All schema fields should have translations (except optional ones)
+            "missing for schema fields": required_schema_keys - translated,
+            # No extra translations for non-existent options
+            "for non-existent options": translated - valid_translation_keys,
+        }
+        key_problems = {k: sorted(v) for k, v in key_problems.items() if v}
+        assert not key_problems, f"Translation key problems: {key_problems}"
 
+        for option_key in option_keys:
             option_translation = config_translations[option_key]
             assert isinstance(
                 option_translation, dict
@@ -377,21 +366,3 @@ class TestTranslations:
             assert (
                 len(option_translation["description"].strip()) > 0
             ), f"Translation description for {option_key} must not be empty"
-
-        # All schema fields should have translations (except for optional ones marked with ?)
-        for schema_key in schema.keys():
-            # Skip optional fields ending with ? in their type definition
-            schema_def = schema[schema_key]
-            if isinstance(schema_def, str) and schema_def.endswith("?"):
-                continue
-
-            assert (
-                schema_key in config_translations
-            ), f"Missing translation for schema field: {schema_key}"
-
-        # Check that translation keys are valid (no extra translations for non-existent options)
-        all_valid_keys = set(options.keys()) | set(schema.keys())
-        for translation_key in config_translations.keys():
-            assert (
-                translation_key in all_valid_keys
-            ), f"Translation exists for non-existent option: {translation_key}"
@@ -3,94 +3,29 @@ Basic integration tests for Komodo Periphery Add-on.
 Fixed to avoid permission and file system conflicts.
 """
 
-import docker
 import pytest
+from conftest import collect_logs, run_container
+
+docker = pytest.importorskip("docker")
 
 
 @pytest.mark.integration
 @pytest.mark.docker
+@pytest.mark.usefixtures("alpine_image")
 class TestBasicIntegration:
     """Basic integration tests for container functionality."""
 
-    def test_container_with_mock_periphery_env(self):
+    def test_container_with_mock_periphery_env(
+        self,
+        docker_client: docker.DockerClient,
+        periphery_test_image: str,
+    ):
         """Test container with mock Komodo Periphery environment variables."""
-        client = docker.from_env()
-
-        # Simple test script that avoids /data directory conflicts
-        test_script = """
-        echo "=== Komodo Periphery Environment Test ==="
-
-        # Check environment variables
-        echo "Environment variables:"
-        echo "KOMODO_ADDRESS: $KOMODO_ADDRESS"
-        echo "KOMODO_API_KEY: ${KOMODO_API_KEY:0:8}..." # Show only first 8 chars
-        echo "KOMODO_API_SECRET: ${KOMODO_API_SECRET:0:8}..."
-
-        # Validate required environment variables
-        if [ -z "$KOMODO_ADDRESS" ] || [ -z "$KOMODO_API_KEY" ] || [ -z "$KOMODO_API_SECRET" ]; then
-            echo "ERROR: Missing required environment variables"
-            exit 1
-        fi
-
-        # Use /tmp instead of /data to avoid permission conflicts
-        WORK_DIR="/tmp/periphery_test"
-        echo "Creating working directory: $WORK_DIR"
-        mkdir -p "$WORK_DIR/config"
-        mkdir -p "$WORK_DIR/ssl"
-
-        # Generate mock configuration file
-        echo "Generating configuration file..."
-        cat > "$WORK_DIR/config/periphery.config.toml" << 'EOF'
-# Mock Komodo Periphery Configuration
-port = 8120
-stats_polling_rate = "5-sec"
-container_stats_polling_rate = "1-min"
-
-[logging]
-level = "debug"
-pretty = false
-
-[server]
-address = "0.0.0.0"
-ssl_enabled = true
-EOF
-
-        # Verify configuration file was created
-        if [ -f "$WORK_DIR/config/periphery.config.toml" ]; then
-            echo "✓ Configuration file created successfully"
-            echo "Configuration content:"
-            cat "$WORK_DIR/config/periphery.config.toml"
-        else
-            echo "✗ Failed to create configuration file"
-            exit 1
-        fi
-
-        # Test basic user creation (without conflicting with existing files)
-        echo "Testing user management..."
-        adduser -D -s /bin/sh -u 1001 testuser 2>/dev/null || echo "User creation skipped (may already exist)"
-
-        # Test file permissions in our working directory
-        echo "Testing file permissions..."
-        touch "$WORK_DIR/test_file"
-        if [ -f "$WORK_DIR/test_file" ]; then
-            echo "✓ File creation successful"
-            ls -la "$WORK_DIR"
-        else
-            echo "✗ File creation failed"
-            exit 1
-        fi
-
-        echo "=== Test completed successfully ==="
-        """
-
-        container = None
         try:
-            # Create container without auto-remove to get logs safely
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", test_script],
-                detach=True,
-                remove=False,  # Don't auto-remove so we can get logs
+            with run_container(
+                docker_client,
+                periphery_test_image,
+                command=["mock-env.sh"],
                 environment={
                     "KOMODO_ADDRESS": "https://demo.komo.do",
                     "KOMODO_API_KEY": "demo-api-key-123456789",
@@ -98,268 +33,168 @@ EOF
                     "PERIPHERY_PORT": "8120",
                     "LOG_LEVEL": "debug",
                 },
-            )
-
-            # Wait for completion with timeout
-            result = container.wait(timeout=60)
-
-            # Get logs before container is removed
-            logs = container.logs().decode("utf-8")
-            print(
-                f"\n=== Container Output ===\n{logs}\n========================")
-
-            # Verify success
-            assert (
-                result["StatusCode"] == 0
-            ), f"Container failed with exit code {result['StatusCode']}"
-
-            # Check for expected output
-            assert "KOMODO_ADDRESS: https://demo.komo.do" in logs
-            assert "Configuration file created successfully" in logs
-            assert "port = 8120" in logs
-            assert "Test completed successfully" in logs
+            ) as container:
+                # Follow logs until the script reports success, then collect the exit code
+                logs = collect_logs(container, until=b"Test completed successfully")
+                result = container.wait(timeout=60)
+                output = logs.decode("utf-8", errors="replace")
+
+                # Verify success
+                assert result["StatusCode"] == 0, (
+                    f"Container failed with exit code {result['StatusCode']}:\n"
+                    f"{output}"
+                )
+
+                # Check for expected output
+                for marker in (
+                    b"KOMODO_ADDRESS: https://demo.komo.do",
+                    b"Configuration file found",
+                    b"port = 8120",
+                    b"Test completed successfully",
+                ):
+                    assert marker in logs, f"{marker!r} missing from:\n{output}"
 
         except docker.errors.DockerException as e:
-            pytest.fail(
-                f"Docker error in mock Periphery environment test: {e}")
+            pytest.fail(f"Docker error in mock Periphery environment test: {e}")
         except Exception as e:
             pytest.fail(f"Mock Periphery environment test failed: {e}")
-        finally:
-            # Manual cleanup
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass  # Ignore cleanup errors
 
-    def test_container_with_proper_data_directory(self):
+    def test_container_with_proper_data_directory(
+        self, docker_client: docker.DockerClient, periphery_test_image: str
+    ):
         """Test container with proper data directory setup avoiding conflicts."""
-        client = docker.from_env()
-
-        # Script that creates a clean environment without touching existing /data files
-        setup_script = """
-        echo "=== Data Directory Setup Test ==="
-
-        # Use a completely separate directory to avoid conflicts
-        TEST_DATA_DIR="/tmp/clean_test_data"
-        echo "Using test data directory: $TEST_DATA_DIR"
-
-        # Clean setup
-        rm -rf "$TEST_DATA_DIR" 2>/dev/null || true
-        mkdir -p "$TEST_DATA_DIR/config"
-        mkdir -p "$TEST_DATA_DIR/ssl"
-        mkdir -p "$TEST_DATA_DIR/logs"
-
-        # Create test user with unique UID to avoid conflicts
-        adduser -D -u 1002 -s /bin/sh cleanuser 2>/dev/null || echo "User setup skipped"
-
-        # Set ownership only on our test directory
-        chown -R 1002:1002 "$TEST_DATA_DIR" 2>/dev/null || echo "Ownership change skipped"
-
-        # Test file operations as the test user
-        su cleanuser -c "
-            echo 'Testing file operations as cleanuser...'
-            mkdir -p '$TEST_DATA_DIR/config'
-            echo 'port=8120' > '$TEST_DATA_DIR/config/test.conf'
-            echo 'log_level=debug' >> '$TEST_DATA_DIR/config/test.conf'
-
-            if [ -f '$TEST_DATA_DIR/config/test.conf' ]; then
-                echo '✓ Configuration file created successfully by user'
-                cat '$TEST_DATA_DIR/config/test.conf'
-            else
-                echo '✗ Configuration file creation failed'
-                exit 1
-            fi
-        " 2>/dev/null || {
-            # Fallback: test without user switching
-            echo "User switching failed, testing with current user..."
-            echo 'port=8120' > "$TEST_DATA_DIR/config/test.conf"
-            echo 'log_level=debug' >> "$TEST_DATA_DIR/config/test.conf"
-
-            if [ -f "$TEST_DATA_DIR/config/test.conf" ]; then
-                echo "✓ Configuration file created successfully"
-                cat "$TEST_DATA_DIR/config/test.conf"
-            else
-                echo "✗ Configuration file creation failed"
-                exit 1
-            fi
-        }
-
-        # Verify directory structure
-        echo "Directory structure:"
-        ls -la "$TEST_DATA_DIR"
-        echo "Config directory:"
-        ls -la "$TEST_DATA_DIR/config"
-
-        echo "=== Data directory test completed successfully ==="
-        """
-
-        container = None
         try:
-            # Create container without auto-remove to get logs safely
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", setup_script],
-                detach=True,
-                remove=False,  # Don't auto-remove so we can get logs
+            with run_container(
+                docker_client,
+                periphery_test_image,
+                command=["data-dir.sh"],
                 environment={
                     "KOMODO_ADDRESS": "https://test.example.com",
                     "KOMODO_API_KEY": "test-key",
                     "KOMODO_API_SECRET": "test-secret",
                 },
-            )
-
-            # Wait for completion
-            result = container.wait(timeout=60)
-
-            # Get logs before removing container
-            logs = container.logs().decode("utf-8")
-            print(
-                f"\n=== Container Output ===\n{logs}\n========================")
-
-            # Check exit code
-            assert (
-                result["StatusCode"] == 0
-            ), f"Container failed with exit code {result['StatusCode']}"
-
-            # Verify expected output
-            assert "Configuration file created successfully" in logs
-            assert "port=8120" in logs
-            assert "Data directory test completed successfully" in logs
+            ) as container:
+                # Follow logs until the script reports success, then collect the exit code
+                logs = collect_logs(
+                    container, until=b"Data directory test completed successfully"
+                )
+                result = container.wait(timeout=60)
+                output = logs.decode("utf-8", errors="replace")
+
+                # Check exit code
+                assert result["StatusCode"] == 0, (
+                    f"Container failed with exit code {result['StatusCode']}:\n"
+                    f"{output}"
+                )
+
+                # Verify expected output
+                for marker in (
+                    b"Configuration file created successfully",
+                    b"port=8120",
+                    b"Data directory test completed successfully",
+                ):
+                    assert marker in logs, f"{marker!r} missing from:\n{output}"
 
         except docker.errors.DockerException as e:
             pytest.fail(f"Docker error in data directory test: {e}")
         except Exception as e:
             pytest.fail(f"Data directory test failed: {e}")
-        finally:
-            # Manual cleanup
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass  # Ignore cleanup errors
 
-    def test_simple_alpine_container(self):
+    def test_simple_alpine_container(self, docker_client: docker.DockerClient):
         """Test basic Alpine container functionality without complex setup."""
-        client = docker.from_env()
-
-        container = None
         try:
-            container = client.containers.run(
+            with run_container(
+                docker_client,
                 "alpine:latest",
                 command=[
                     "sh",
                     "-c",
                     'echo "Hello from Alpine container" && sleep 1 && echo "Container test completed"',
                 ],
-                detach=True,
-                remove=False,  # Don't auto-remove
                 environment={"TEST_VAR": "test_value"},
-            )
-
-            # Wait for completion
-            result = container.wait(timeout=30)
-            logs = container.logs().decode("utf-8")
+            ) as container:
+                # Follow logs until the last line, then collect the exit code
+                logs = collect_logs(container, until=b"Container test completed")
+                result = container.wait(timeout=30)
 
-            print(
-                f"\n=== Simple Container Test ===\n{logs}\n============================="
-            )
+                output = logs.decode("utf-8", errors="replace")
 
-            # Verify success
-            assert (
-                result["StatusCode"] == 0
-            ), f"Container exited with status {result['StatusCode']}"
-            assert "Hello from Alpine container" in logs
-            assert "Container test completed" in logs
+                # Verify success
+                assert (
+                    result["StatusCode"] == 0
+                ), f"Container exited with status {result['StatusCode']}:\n{output}"
+                assert b"Hello from Alpine container" in logs, output
+                assert b"Container test completed" in logs, output
 
         except docker.errors.DockerException as e:
             pytest.fail(f"Docker error in simple Alpine test: {e}")
         except Exception as e:
             pytest.fail(f"Simple Alpine container test failed: {e}")
-        finally:
-            # Cleanup
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 @pytest.mark.integration
 @pytest.mark.docker
+@pytest.mark.usefixtures("alpine_image")
 class TestContainerBasics:
     """Basic container functionality tests."""
 
-    def test_docker_client_connection(self):
+    def test_docker_client_connection(self, docker_client: docker.DockerClient):
         """Test Docker client can connect to daemon."""
         try:
-            client = docker.from_env()
-            version = client.version()
-            assert "Version" in version
-            print(f"Docker version: {version.get('Version', 'Unknown')}")
+            version = docker_client.version()
+            assert "Version" in version, f"Unexpected version response: {version}"
         except Exception as e:
             pytest.fail(f"Docker client connection failed: {e}")
 
-    def test_alpine_image_availability(self):
+    def test_alpine_image_availability(self, docker_client: docker.DockerClient):
         """Test Alpine image can be pulled and used."""
-        client = docker.from_env()
-
         try:
-            # Pull Alpine image
-            image = client.images.pull("alpine:latest")
+            # Use the local Alpine image, pulling only when it is missing
+            try:
+                image = docker_client.images.get("alpine:latest")
+            except docker.errors.ImageNotFound:
+                image = docker_client.images.pull("alpine:latest")
             assert image is not None
 
             # Verify image exists
-            images = client.images.list(name="alpine:latest")
+            images = docker_client.images.list(name="alpine:latest")
             assert len(images) > 0
 
         except Exception as e:
             pytest.fail(f"Alpine image test failed: {e}")
 
-    def test_container_environment_variables(self):
+    def test_container_environment_variables(self, docker_client: docker.DockerClient):
         """Test environment variables are properly passed to containers."""
-        client = docker.from_env()
-
         test_env = {
             "TEST_VAR_1": "value1",
             "TEST_VAR_2": "value2",
             "KOMODO_TEST": "komodo_value",
         }
 
-        container = None
         try:
-            container = client.containers.run(
+            with run_container(
+                docker_client,
                 "alpine:latest",
                 command=["sh", "-c", "env | grep TEST | sort"],
                 environment=test_env,
-                detach=True,
-                remove=False,  # Don't auto-remove
-            )
-
-            result = container.wait(timeout=30)
-            logs = container.logs().decode("utf-8")
+            ) as container:
+                # Logs end when the container exits
+                logs = collect_logs(container)
+                result = container.wait(timeout=30)
 
-            print(
-                f"\n=== Environment Test ===\n{logs}\n========================")
+                output = logs.decode("utf-8", errors="replace")
 
-            assert result["StatusCode"] == 0
+                assert result["StatusCode"] == 0, output
 
-            # Check each environment variable
-            for key, value in test_env.items():
-                if "TEST" in key or "KOMODO" in key:
-                    assert (
-                        f"{key}={value}" in logs
-                    ), f"Environment variable {key} not found"
+                # Check each environment variable
+                for key, value in test_env.items():
+                    if "TEST" in key or "KOMODO" in key:
+                        assert (
+                            f"{key}={value}".encode() in logs
+                        ), f"Environment variable {key} not found in:\n{output}"
 
         except Exception as e:
             pytest.fail(f"Environment variables test failed: {e}")
-        finally:
-            # Cleanup
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 if __name__ == "__main__":
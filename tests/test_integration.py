@@ -1,12 +1,65 @@
 """
 Integration tests for Komodo Periphery Add-on.
-Updated to work with current project setup and avoid fixture dependencies.
+Scripts are exec'd in the shared alpine_shell container; tests that need a
+container of their own start it through the docker_client fixture.
 """
 
 import time
+from typing import List
 
 import docker
 import pytest
+from conftest import (
+    ALPINE_TMPFS,
+    XDIST_WORKER,
+    collect_logs,
+    missing_markers,
+    run_container,
+)
+
+# Seconds a script may run before timeout(1) kills it inside the container
+SCRIPT_TIMEOUT = 10
+
+# Startup budget for the performance test; parallel xdist workers contend
+# for the Docker daemon, so allow more headroom there
+STARTUP_TIME_LIMIT = 10 if XDIST_WORKER == "master" else 30
+
+# Lines each container script prints on success, checked in one pass
+KOMODO_ENV_MARKERS = (
+    "Configuration file created",
+    "port = 8120",
+    "Container integration test completed",
+)
+MOCK_BINARY_MARKERS = (
+    "Starting periphery agent",
+    "Binding to port 8120",
+    "Mock periphery binary test completed",
+)
+DOCKER_SOCKET_MARKERS = (
+    "Docker client availability",
+    "Docker socket access simulation completed",
+)
+CONFIGURATION_MARKERS = (
+    "Port setting found",
+    "SSL setting found",
+    "Logging section found",
+    "Configuration integration test completed",
+)
+PERFORMANCE_MARKERS = (
+    "Startup completed",
+    "Performance integration test completed",
+)
+ERROR_HANDLING_MARKERS = (
+    "Invalid port detected and handled",
+    "Missing environment variable detected",
+    "Invalid URL detected and handled",
+    "Error handling integration test completed",
+)
+
+
+def script_command(script: str) -> List[str]:
+    """Build the command running ``script`` under the in-container time limit."""
+    return ["timeout", str(SCRIPT_TIMEOUT), "sh", "-c", script]
 
 
 @pytest.mark.integration
@@ -14,29 +67,20 @@ import pytest
 class TestContainerIntegration:
     """Integration tests for container functionality."""
 
-    def test_alpine_container_with_komodo_env(self):
+    def test_alpine_container_with_komodo_env(
+        self, alpine_shell: docker.models.containers.Container
+    ):
         """Test Alpine container with Komodo environment setup."""
-        client = docker.from_env()
-
         # Script that mimics Komodo Periphery startup
         startup_script = """
         echo "=== Komodo Periphery Container Test ==="
 
-        # Verify environment variables
-        echo "Checking environment variables..."
-        echo "KOMODO_ADDRESS: $KOMODO_ADDRESS"
-        echo "KOMODO_API_KEY: ${KOMODO_API_KEY:0:8}***"
-        echo "KOMODO_API_SECRET: ${KOMODO_API_SECRET:0:8}***"
-
         # Create mock periphery setup
         WORK_DIR="/tmp/komodo_periphery"
-        mkdir -p "$WORK_DIR/config"
-        mkdir -p "$WORK_DIR/ssl"
-        mkdir -p "$WORK_DIR/logs"
+        mkdir -p "$WORK_DIR/config" "$WORK_DIR/ssl" "$WORK_DIR/logs"
 
-        # Generate configuration file
-        cat > "$WORK_DIR/config/periphery.config.toml" << 'EOF'
-# Komodo Periphery Configuration
+        # Generate configuration file with the printf builtin
+        printf '%s\\n' '# Komodo Periphery Configuration
 port = 8120
 stats_polling_rate = "5-sec"
 container_stats_polling_rate = "1-min"
@@ -47,89 +91,48 @@ level = "debug"
 pretty = false
 
 [server]
-address = "0.0.0.0"
-EOF
-
-        # Create mock SSL certificates
-        echo "Generating mock SSL certificates..."
-        openssl req -x509 -newkey rsa:2048 -keyout "$WORK_DIR/ssl/key.pem" \
-            -out "$WORK_DIR/ssl/cert.pem" -days 1 -nodes \
-            -subj "/C=US/ST=Test/L=Test/O=Test/CN=periphery" 2>/dev/null || echo "SSL generation skipped"
-
-        # Test port binding simulation
-        echo "Testing port 8120 availability..."
-        nc -l -p 8120 &
-        NC_PID=$!
-        sleep 2
-
-        # Check if port is bound
-        if netstat -ln 2>/dev/null | grep -q ":8120"; then
-            echo "✓ Port 8120 successfully bound"
-        else
-            echo "⚠ Port binding test skipped (netstat/nc not available)"
-        fi
-
-        # Cleanup background process
-        kill $NC_PID 2>/dev/null || true
+address = "0.0.0.0"' > "$WORK_DIR/config/periphery.config.toml"
 
         # Verify configuration
         if [ -f "$WORK_DIR/config/periphery.config.toml" ]; then
             echo "✓ Configuration file created"
             echo "Port setting:"
-            grep "port = " "$WORK_DIR/config/periphery.config.toml"
+            while read -r line; do
+                case $line in "port = "*) echo "$line" ;; esac
+            done < "$WORK_DIR/config/periphery.config.toml"
         fi
 
         echo "=== Container integration test completed ==="
         """
 
-        container = None
         try:
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", startup_script],
-                detach=True,
-                remove=False,
-                environment={
-                    "KOMODO_ADDRESS": "https://test.komodo.example.com",
-                    "KOMODO_API_KEY": "integration-test-key-12345",
-                    "KOMODO_API_SECRET": "integration-test-secret-67890",
-                    "PERIPHERY_PORT": "8120",
-                    "PERIPHERY_SSL_ENABLED": "true",
-                },
-                # Don't expose ports for this test - just test internal functionality
+            exit_code, output = alpine_shell.exec_run(
+                script_command(startup_script),
+                stderr=False,
             )
-
-            result = container.wait(timeout=60)
-            logs = container.logs().decode("utf-8")
+            logs = output.decode("utf-8")
 
             print(
-                f"\n=== Container Integration Test ===\n{logs}\n================================"
+                "\n=== Container Integration Test ===",
+                logs,
+                "================================",
+                sep="\n",
             )
 
             # Verify success
-            assert (
-                result["StatusCode"] == 0
-            ), f"Container failed: {result['StatusCode']}"
+            assert exit_code == 0, f"Script failed: {exit_code}"
 
             # Check expected behavior
-            assert "KOMODO_ADDRESS: https://test.komodo.example.com" in logs
-            assert "Configuration file created" in logs
-            assert "port = 8120" in logs
-            assert "Container integration test completed" in logs
+            missing = missing_markers(logs, KOMODO_ENV_MARKERS)
+            assert not missing, f"Missing from logs: {sorted(missing)}"
 
         except Exception as e:
             pytest.fail(f"Container integration test failed: {e}")
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
-
-    def test_container_with_mock_periphery_binary(self):
-        """Test container with mock periphery binary."""
-        client = docker.from_env()
 
+    def test_container_with_mock_periphery_binary(
+        self, alpine_shell: docker.models.containers.Container
+    ):
+        """Test container with mock periphery binary."""
         # Create a mock periphery binary and test its execution
         mock_periphery_script = """
         echo "=== Mock Periphery Binary Test ==="
@@ -139,18 +142,15 @@ EOF
         mkdir -p "$WORK_DIR"
 
         # Create mock periphery executable
-        cat > "$WORK_DIR/periphery" << 'EOF'
-#!/bin/sh
+        printf '%s\\n' '#!/bin/sh
 echo "Komodo Periphery v1.0.0"
 echo "Starting periphery agent..."
 echo "Binding to port 8120"
 echo "SSL enabled: true"
 echo "Polling rate: 5-sec"
 echo "Ready to accept connections"
-# Simulate running for a short time
-sleep 5
-echo "Shutting down gracefully"
-EOF
+# Simulate running for a short time; exec so kill reaches the sleep itself
+exec sleep 5' > "$WORK_DIR/periphery"
 
         chmod +x "$WORK_DIR/periphery"
 
@@ -175,40 +175,26 @@ EOF
         echo "=== Mock periphery binary test completed ==="
         """
 
-        container = None
         try:
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", mock_periphery_script],
-                detach=True,
-                remove=False,
-                environment={
-                    "KOMODO_ADDRESS": "https://mock.example.com",
-                    "KOMODO_API_KEY": "mock-key",
-                    "KOMODO_API_SECRET": "mock-secret",
-                },
+            exit_code, output = alpine_shell.exec_run(
+                script_command(mock_periphery_script),
+                stderr=False,
             )
-
-            result = container.wait(timeout=60)
-            logs = container.logs().decode("utf-8")
+            logs = output.decode("utf-8")
 
             print(
-                f"\n=== Mock Periphery Binary Test ===\n{logs}\n================================="
+                "\n=== Mock Periphery Binary Test ===",
+                logs,
+                "=================================",
+                sep="\n",
             )
 
-            assert result["StatusCode"] == 0
-            assert "Starting periphery agent" in logs
-            assert "Binding to port 8120" in logs
-            assert "Mock periphery binary test completed" in logs
+            assert exit_code == 0
+            missing = missing_markers(logs, MOCK_BINARY_MARKERS)
+            assert not missing, f"Missing from logs: {sorted(missing)}"
 
         except Exception as e:
             pytest.fail(f"Mock periphery binary test failed: {e}")
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 @pytest.mark.integration
@@ -216,10 +202,10 @@ EOF
 class TestDockerIntegration:
     """Integration tests for Docker functionality."""
 
-    def test_container_with_docker_socket_simulation(self):
+    def test_container_with_docker_socket_simulation(
+        self, alpine_shell: docker.models.containers.Container
+    ):
         """Test container with Docker socket access simulation."""
-        client = docker.from_env()
-
         docker_test_script = """
         echo "=== Docker Socket Integration Test ==="
 
@@ -248,34 +234,25 @@ class TestDockerIntegration:
         echo "=== Docker integration test completed ==="
         """
 
-        container = None
         try:
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", docker_test_script],
-                detach=True,
-                remove=False,
+            exit_code, output = alpine_shell.exec_run(
+                script_command(docker_test_script), stderr=False
             )
-
-            result = container.wait(timeout=30)
-            logs = container.logs().decode("utf-8")
+            logs = output.decode("utf-8")
 
             print(
-                f"\n=== Docker Integration Test ===\n{logs}\n=============================="
+                "\n=== Docker Integration Test ===",
+                logs,
+                "==============================",
+                sep="\n",
             )
 
-            assert result["StatusCode"] == 0
-            assert "Docker client availability" in logs
-            assert "Docker socket access simulation completed" in logs
+            assert exit_code == 0
+            missing = missing_markers(logs, DOCKER_SOCKET_MARKERS)
+            assert not missing, f"Missing from logs: {sorted(missing)}"
 
         except Exception as e:
             pytest.fail(f"Docker integration test failed: {e}")
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 @pytest.mark.integration
@@ -283,10 +260,10 @@ class TestDockerIntegration:
 class TestNetworkIntegration:
     """Integration tests for network functionality."""
 
-    def test_container_network_connectivity(self):
+    def test_container_network_connectivity(
+        self, alpine_shell: docker.models.containers.Container
+    ):
         """Test container network connectivity."""
-        client = docker.from_env()
-
         network_test_script = """
         echo "=== Network Integration Test ==="
 
@@ -300,82 +277,46 @@ class TestNetworkIntegration:
             echo "⚠ DNS resolution test skipped"
         fi
 
-        # Test HTTP connectivity (if available)
-        if command -v wget >/dev/null 2>&1; then
-            if wget -q --spider --timeout=5 http://httpbin.org/status/200 2>/dev/null; then
-                echo "✓ HTTP connectivity working"
-            else
-                echo "⚠ HTTP connectivity test failed or skipped"
-            fi
-        else
-            echo "⚠ wget not available, HTTP test skipped"
-        fi
-
-        # Test port binding
-        echo "Testing port binding capabilities..."
-        (echo "test" | nc -l -p 9999) &
-        NC_PID=$!
-        sleep 1
-
-        if netstat -ln 2>/dev/null | grep -q ":9999"; then
-            echo "✓ Port binding test successful"
-        else
-            echo "⚠ Port binding test skipped (netstat not available)"
-        fi
-
-        kill $NC_PID 2>/dev/null || true
-
         echo "=== Network integration test completed ==="
         """
 
-        container = None
         try:
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", network_test_script],
-                detach=True,
-                remove=False,
-                network_mode="bridge",
+            exit_code, output = alpine_shell.exec_run(
+                script_command(network_test_script), stderr=False
             )
-
-            result = container.wait(timeout=45)
-            logs = container.logs().decode("utf-8")
+            logs = output.decode("utf-8")
 
             print(
-                f"\n=== Network Integration Test ===\n{logs}\n==============================="
+                "\n=== Network Integration Test ===",
+                logs,
+                "===============================",
+                sep="\n",
             )
 
-            assert result["StatusCode"] == 0
+            assert exit_code == 0
             assert "Network integration test completed" in logs
 
         except Exception as e:
             pytest.fail(f"Network integration test failed: {e}")
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 @pytest.mark.integration
 class TestConfigurationIntegration:
     """Integration tests for configuration handling."""
 
-    def test_configuration_file_processing(self):
+    def test_configuration_file_processing(
+        self, alpine_shell: docker.models.containers.Container
+    ):
         """Test configuration file generation and processing."""
-        client = docker.from_env()
-
         config_test_script = r"""
         echo "=== Configuration Integration Test ==="
 
         CONFIG_DIR="/tmp/periphery_config"
-        mkdir -p "$CONFIG_DIR"
+        mkdir -p "$CONFIG_DIR/ssl"
 
         # Test TOML configuration generation
         echo "Generating TOML configuration..."
-        cat > "$CONFIG_DIR/periphery.config.toml" << 'EOF'
-# Komodo Periphery Configuration
+        printf '%s\n' '# Komodo Periphery Configuration
 port = 8120
 stats_polling_rate = "5-sec"
 container_stats_polling_rate = "1-min"
@@ -392,40 +333,35 @@ ssl_cert_file = "/ssl/cert.pem"
 
 [monitoring]
 system_metrics = true
-docker_metrics = true
-EOF
+docker_metrics = true' > "$CONFIG_DIR/periphery.config.toml"
 
         # Test configuration parsing
         echo "Testing configuration file parsing..."
-        if grep -q "port = 8120" "$CONFIG_DIR/periphery.config.toml"; then
-            echo "✓ Port setting found"
-        fi
-
-        if grep -q "ssl_enabled = true" "$CONFIG_DIR/periphery.config.toml"; then
-            echo "✓ SSL setting found"
-        fi
-
-        if grep -q "\[logging\]" "$CONFIG_DIR/periphery.config.toml"; then
-            echo "✓ Logging section found"
-        fi
+        awk '/port = 8120/ { p = 1 }
+             /ssl_enabled = true/ { s = 1 }
+             /\[logging\]/ { l = 1 }
+             END {
+                 if (p) print "✓ Port setting found"
+                 if (s) print "✓ SSL setting found"
+                 if (l) print "✓ Logging section found"
+             }' "$CONFIG_DIR/periphery.config.toml"
 
         # Test environment variable substitution simulation
         echo "Testing environment variable processing..."
         KOMODO_ADDRESS="https://config.test.example.com"
         KOMODO_API_KEY="config-test-key"
 
-        echo "KOMODO_ADDRESS=$KOMODO_ADDRESS" > "$CONFIG_DIR/env_config"
-        echo "KOMODO_API_KEY=$KOMODO_API_KEY" >> "$CONFIG_DIR/env_config"
+        printf '%s\n' "KOMODO_ADDRESS=$KOMODO_ADDRESS" "KOMODO_API_KEY=$KOMODO_API_KEY" \
+            > "$CONFIG_DIR/env_config"
 
         if [ -f "$CONFIG_DIR/env_config" ]; then
             echo "✓ Environment configuration processed"
-            cat "$CONFIG_DIR/env_config"
+            while read -r line; do echo "$line"; done < "$CONFIG_DIR/env_config"
         fi
 
         # Test SSL certificate directory simulation
-        mkdir -p "$CONFIG_DIR/ssl"
-        touch "$CONFIG_DIR/ssl/cert.pem"
-        touch "$CONFIG_DIR/ssl/key.pem"
+        : > "$CONFIG_DIR/ssl/cert.pem"
+        : > "$CONFIG_DIR/ssl/key.pem"
 
         if [ -f "$CONFIG_DIR/ssl/cert.pem" ] && [ -f "$CONFIG_DIR/ssl/key.pem" ]; then
             echo "✓ SSL certificate files created"
@@ -434,70 +370,47 @@ EOF
         echo "=== Configuration integration test completed ==="
         """
 
-        container = None
         try:
-            container = client.containers.run(
-                "alpine:latest",
-                command=["sh", "-c", config_test_script],
-                detach=True,
-                remove=False,
-                environment={
-                    "KOMODO_ADDRESS": "https://config.test.example.com",
-                    "KOMODO_API_KEY": "config-test-key",
-                    "KOMODO_API_SECRET": "config-test-secret",
-                },
+            exit_code, output = alpine_shell.exec_run(
+                script_command(config_test_script),
+                stderr=False,
             )
-
-            result = container.wait(timeout=30)
-            logs = container.logs().decode("utf-8")
+            logs = output.decode("utf-8")
 
             print(
-                f"\n=== Configuration Integration Test ===\n{logs}\n====================================="
+                "\n=== Configuration Integration Test ===",
+                logs,
+                "=====================================",
+                sep="\n",
             )
 
-            assert result["StatusCode"] == 0
-            assert "Port setting found" in logs
-            assert "SSL setting found" in logs
-            assert "Logging section found" in logs
-            assert "Configuration integration test completed" in logs
+            assert exit_code == 0
+            missing = missing_markers(logs, CONFIGURATION_MARKERS)
+            assert not missing, f"Missing from logs: {sorted(missing)}"
 
         except Exception as e:
             pytest.fail(f"Configuration integration test failed: {e}")
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 @pytest.mark.integration
 @pytest.mark.slow
+@pytest.mark.usefixtures("alpine_image")
 class TestPerformanceIntegration:
     """Integration tests for performance characteristics."""
 
-    def test_container_startup_performance(self):
+    def test_container_startup_performance(self, docker_client: docker.DockerClient):
         """Test container startup time and resource usage."""
-        client = docker.from_env()
-
         performance_script = """
         echo "=== Performance Integration Test ==="
 
         echo "Testing startup performance..."
         START_TIME=$(date +%s)
 
-        # Simulate periphery startup tasks
+        # Report the periphery startup phases
         echo "Initializing configuration..."
-        sleep 1
-
         echo "Loading SSL certificates..."
-        sleep 0.5
-
         echo "Starting monitoring services..."
-        sleep 1
-
         echo "Binding to network port..."
-        sleep 0.5
 
         END_TIME=$(date +%s)
         STARTUP_TIME=$((END_TIME - START_TIME))
@@ -524,58 +437,57 @@ class TestPerformanceIntegration:
         echo "=== Performance integration test completed ==="
         """
 
-        container = None
         try:
             start_time = time.time()
 
-            container = client.containers.run(
+            with run_container(
+                docker_client,
                 "alpine:latest",
-                command=["sh", "-c", performance_script],
-                detach=True,
-                remove=False,
-                mem_limit="256m",  # Set memory limit for testing
-                cpu_shares=512,  # Limit CPU for testing
-            )
-
-            result = container.wait(timeout=60)
-
-            end_time = time.time()
-            actual_startup_time = end_time - start_time
-
-            logs = container.logs().decode("utf-8")
+                command=script_command(performance_script),
+                host_config=docker_client.api.create_host_config(
+                    mem_limit="256m",  # Set memory limit for testing
+                    cpu_shares=512,  # Limit CPU for testing
+                    tmpfs=ALPINE_TMPFS,
+                ),
+            ) as container:
+                # The log stream ends when the script exits, so wait() returns
+                # at once with the status code
+                logs = collect_logs(container).decode("utf-8")
+                result = container.wait(timeout=5)
+
+                end_time = time.time()
+                actual_startup_time = end_time - start_time
 
-            print(
-                f"\n=== Performance Integration Test ===\n{logs}\n==================================="
-            )
-            print(f"Actual container startup time: {actual_startup_time:.2f}s")
+                print(
+                    "\n=== Performance Integration Test ===",
+                    logs,
+                    "===================================",
+                    sep="\n",
+                )
+                print(f"Actual container startup time: {actual_startup_time:.2f}s")
 
-            assert result["StatusCode"] == 0
-            assert "Startup completed" in logs
-            assert "Performance integration test completed" in logs
+                assert result["StatusCode"] == 0
+                missing = missing_markers(logs, PERFORMANCE_MARKERS)
+                assert not missing, f"Missing from logs: {sorted(missing)}"
 
-            # Verify reasonable startup time
-            assert (
-                actual_startup_time < 30
-            ), f"Container startup too slow: {actual_startup_time}s"
+                # Verify reasonable startup time
+                assert (
+                    actual_startup_time < STARTUP_TIME_LIMIT
+                ), f"Container startup too slow: {actual_startup_time}s"
 
         except Exception as e:
             pytest.fail(f"Performance integration test failed: {e}")
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
 
 
 @pytest.mark.integration
+@pytest.mark.usefixtures("alpine_image")
 class TestErrorHandling:
     """Integration tests for error handling scenarios."""
 
-    def test_invalid_configuration_handling(self):
+    def test_invalid_configuration_handling(
+        self, alpine_shell: docker.models.containers.Container
+    ):
         """Test handling of invalid configuration scenarios."""
-        client = docker.from_env()
-
         error_handling_script = r"""
         echo "=== Error Handling Integration Test ==="
 
@@ -583,11 +495,10 @@ class TestErrorHandling:
         echo "Testing invalid port handling..."
         INVALID_PORT="invalid_port"
 
-        if echo "$INVALID_PORT" | grep -q "^[0-9]*$"; then
-            echo "Port is valid: $INVALID_PORT"
-        else
-            echo "✓ Invalid port detected and handled: $INVALID_PORT"
-        fi
+        case $INVALID_PORT in
+            *[!0-9]*) echo "✓ Invalid port detected and handled: $INVALID_PORT" ;;
+            *) echo "Port is valid: $INVALID_PORT" ;;
+        esac
 
         # Test missing required environment variables
         echo "Testing missing environment variable handling..."
@@ -599,15 +510,17 @@ class TestErrorHandling:
         echo "Testing invalid URL handling..."
         INVALID_URL="not-a-valid-url"
 
-        if echo "$INVALID_URL" | grep -q "^https\\?://"; then
-            echo "URL is valid: $INVALID_URL"
-        else
-            echo "✓ Invalid URL detected and handled: $INVALID_URL"
-        fi
+        case $INVALID_URL in
+            http://* | https://*) echo "URL is valid: $INVALID_URL" ;;
+            *) echo "✓ Invalid URL detected and handled: $INVALID_URL" ;;
+        esac
 
-        # Test file permission errors simulation
+        # Test file permission errors simulation; the shell container is
+        # shared, so work in a private directory that is removed on exit
         echo "Testing permission error handling..."
-        RESTRICTED_DIR="/root/restricted"
+        WORK_DIR=$(mktemp -d)
+        trap 'rm -rf "$WORK_DIR"' EXIT
+        RESTRICTED_DIR="$WORK_DIR/restricted"
 
         if mkdir "$RESTRICTED_DIR" 2>/dev/null; then
             echo "Directory created: $RESTRICTED_DIR"
@@ -626,10 +539,30 @@ class TestErrorHandling:
         echo "=== Error handling integration test completed ==="
         """
 
-    def test_graceful_shutdown_handling(self):
-        """Test graceful shutdown and cleanup."""
-        client = docker.from_env()
+        try:
+            exit_code, output = alpine_shell.exec_run(
+                script_command(error_handling_script), stderr=False
+            )
+            logs = output.decode("utf-8")
+
+            print(
+                "\n=== Error Handling Test ===",
+                logs,
+                "==========================",
+                sep="\n",
+            )
+
+            assert exit_code == 0
+            missing = missing_markers(logs, ERROR_HANDLING_MARKERS)
+            assert not missing, f"Missing from logs: {sorted(missing)}"
+
+        except Exception as e:
+            pytest.fail(f"Error handling test failed: {e}")
 
+    # Starts a dedicated container and waits on signal handling
+    @pytest.mark.slow
+    def test_graceful_shutdown_handling(self, docker_client: docker.DockerClient):
+        """Test graceful shutdown and cleanup."""
         shutdown_script = """
         echo "=== Graceful Shutdown Integration Test ==="
 
@@ -665,29 +598,27 @@ class TestErrorHandling:
         echo "Service stopped normally"
         """
 
-        container = None
         try:
-            container = client.containers.run(
+            with run_container(
+                docker_client,
                 "alpine:latest",
                 command=["sh", "-c", shutdown_script],
-                detach=True,
-                remove=False,
-            )
+                host_config=docker_client.api.create_host_config(tmpfs=ALPINE_TMPFS),
+            ) as container:
+                # Follow the log once until the trap is installed, no re-fetching
+                collect_logs(container, until=b"Waiting for shutdown signal")
 
-            # Let it start up
-            time.sleep(2)
-
-            # Check if container is still running before sending signal
-            container.reload()
-            if container.status == "running":
-                # Send shutdown signal
+                # The handler is in place, so signal right away
                 container.kill(signal="TERM")
 
                 result = container.wait(timeout=15)
-                logs = container.logs().decode("utf-8")
+                logs = container.logs(stderr=False).decode("utf-8")
 
                 print(
-                    f"\n=== Graceful Shutdown Test ===\n{logs}\n============================="
+                    "\n=== Graceful Shutdown Test ===",
+                    logs,
+                    "=============================",
+                    sep="\n",
                 )
 
                 # Container should exit cleanly (exit code 0 or 143 for SIGTERM)
@@ -700,26 +631,10 @@ class TestErrorHandling:
                     "Graceful shutdown completed" in logs
                     or "Received shutdown signal" in logs
                 )
-            else:
-                # Container already stopped, check logs for completion
-                logs = container.logs().decode("utf-8")
-                print(
-                    f"\n=== Graceful Shutdown Test (Early Exit) ===\n{logs}\n=========================================="
-                )
-
-                assert "Starting mock periphery service" in logs
-                # If container stopped early, that's also acceptable for this test
 
         except Exception as e:
             pytest.fail(f"Graceful shutdown test failed: {e}")
 
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except Exception:
-                    pass
-
 
 if __name__ == "__main__":
     # Run tests directly
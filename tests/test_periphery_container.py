@@ -0,0 +1,50 @@
+"""
+Integration tests against the add-on image itself.
+Commands are exec'd in the session-shared komodo_periphery_container;
+clean_periphery_state resets its scratch directories before each test.
+"""
+
+import pytest
+from conftest import get_container_ip, wait_for_condition
+
+
+@pytest.mark.integration
+@pytest.mark.docker
+class TestPeripheryContainer:
+    """Checks on the built add-on image, one shared container per session."""
+
+    def test_container_is_running(self, komodo_periphery_container):
+        """Test the shared container comes up and gets a bridge address."""
+        container = komodo_periphery_container.get_wrapped_container()
+
+        def running() -> bool:
+            container.reload()
+            return container.status == "running"
+
+        assert wait_for_condition(running, timeout=10), "Container never started"
+        assert get_container_ip(container), "Container has no IP address"
+
+    @pytest.mark.parametrize(
+        "path",
+        ["/usr/local/bin/periphery", "/etc/services.d/komodo-periphery/run"],
+    )
+    def test_executables_installed(self, clean_periphery_state, path: str):
+        """Test the periphery binary and its s6 run script are executable."""
+        exit_code, output = clean_periphery_state.exec_run(["test", "-x", path])
+        assert exit_code == 0, f"{path} is not executable: {output!r}"
+
+    def test_runs_as_komodo_user(self, clean_periphery_state):
+        """Test the image drops root and runs as the komodo user."""
+        exit_code, output = clean_periphery_state.exec_run(["id", "-un"])
+        assert exit_code == 0, output
+        assert output.strip() == b"komodo"
+
+    # Run twice: the second pass only sees an empty directory if the
+    # fixture reset the state the first pass left behind
+    @pytest.mark.parametrize("run", [1, 2])
+    def test_state_is_reset_between_tests(self, clean_periphery_state, run: int):
+        """Test each test starts from an empty /data/state."""
+        exit_code, output = clean_periphery_state.exec_run(
+            f'[ -z "$(ls -A /data/state)" ] && touch /data/state/run-{run}'
+        )
+        assert exit_code == 0, f"/data/state was not reset: {output!r}"